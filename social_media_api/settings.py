@@ -53,6 +53,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "social_network.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -140,6 +141,49 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "/media/"
 
+# Media is stored once per content hash, see social_network.storage.
+STORAGES = {
+    "default": {"BACKEND": "social_network.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+MEDIA_BLOB_GC_GRACE_PERIOD = 60 * 60
+
+# Set MEDIA_SENDFILE to "x-sendfile" or "x-accel-redirect" to let the front
+# proxy send media files, nginx needs an internal location at the prefix.
+MEDIA_SENDFILE = os.environ.get("MEDIA_SENDFILE")
+
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
+# Image renditions are generated by a background thread pool after commit,
+# set IMAGE_RENDITIONS_EAGER to generate them inline instead.
+IMAGE_RENDITION_WORKERS = 2
+
+IMAGE_RENDITIONS_EAGER = False
+
+# Chunked uploads are assembled here, outside MEDIA_ROOT, until finalized.
+CHUNKED_UPLOAD_ROOT = BASE_DIR / "chunked_uploads"
+
+CHUNKED_UPLOAD_MAX_SIZE = 50 * 1024 * 1024
+
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Render post and profile lists from .values() rows instead of model
+# instances, see social_network.fast_lists.
+FAST_LIST_RENDERING = True
+
+# Live feed (Server-Sent Events) replay buffer and per-connection queue size,
+# heartbeat interval in seconds and client reconnect delay in milliseconds.
+LIVE_FEED_BUFFER_SIZE = 1000
+
+LIVE_FEED_MAX_PENDING = 1000
+
+LIVE_FEED_HEARTBEAT = 15
+
+LIVE_FEED_RETRY_MS = 3000
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -147,11 +191,50 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "user.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_CLASSES": [
+        "social_network.throttling.TokenBucketThrottle",
+    ],
+    # Clients are identified by REMOTE_ADDR; set this to the number of
+    # trusted proxies in front of the app to read X-Forwarded-For instead.
+    "NUM_PROXIES": 0,
 }
 
+# Token bucket policies per view throttle_scope: "<burst>/<period>" allows a
+# burst of that many requests, refilled evenly over the period. Backends are
+# MemoryBackend (per process), DatabaseBackend and CacheBackend.
+RATE_LIMIT_BACKEND = "social_network.throttling.MemoryBackend"
+
+RATE_LIMITS = {
+    "default": "600/m",
+    "login": "10/m",
+    "comment": "30/m",
+}
+
+# Tokens expire TOKEN_LIFETIME seconds after they are issued (None never
+# expires), lookups are cached per process for up to TOKEN_CACHE_TTL seconds.
+# Revoked tokens are flagged in TOKEN_REVOCATION_CACHE; with several worker
+# processes it must be a cache they share (Redis, Memcached), otherwise
+# other workers notice a revocation only when their entry expires.
+TOKEN_LIFETIME = 30 * 24 * 60 * 60
+
+TOKEN_CACHE_SIZE = 10000
+
+TOKEN_CACHE_TTL = 5
+
+TOKEN_REVOCATION_CACHE = "default"
+
+# Request metrics served on /metrics. With several worker processes set
+# METRICS_DIR to a directory they share; each writes its metrics there every
+# METRICS_FLUSH_INTERVAL seconds and /metrics sums them.
+METRICS_DIR = os.environ.get("METRICS_DIR")
+
+METRICS_FLUSH_INTERVAL = 5
+
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Social Media API",
     "DESCRIPTION": "RESTful API for social media platform",
@@ -1,7 +1,9 @@
 from django.contrib import admin
-from social_network.models import Profile, Comment, Post, Like
+from social_network.models import Profile, Comment, Post, Like, Hashtag, MediaBlob
 
 admin.site.register(Profile)
 admin.site.register(Post)
 admin.site.register(Comment)
 admin.site.register(Like)
+admin.site.register(Hashtag)
+admin.site.register(MediaBlob)
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class SocialNetworkConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "social_network"
+
+    def ready(self):
+        import social_network.signals  # noqa: F401
+        from social_network.search import install_search_index
+
+        post_migrate.connect(install_search_index, sender=self)
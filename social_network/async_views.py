@@ -0,0 +1,241 @@
+import asyncio
+from functools import wraps
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+from rest_framework import exceptions, status
+from rest_framework.authentication import get_authorization_header
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from social_network.etags import apost_etag, aprofile_etag, vary_etag
+from social_network.fast_lists import ValuesRenderer
+from social_network.follows import Follow
+from social_network.live import hub
+from social_network.models import Post, Profile
+from social_network.pagination import PostCursorPagination, ProfileCursorPagination
+from user.authentication import aauthenticate_token
+from social_network.search import filter_posts, filter_profiles
+from social_network.throttling import TokenBucketThrottle
+from social_network.timeline import feed_posts
+from social_network.serializers import (
+    PostListSerializer,
+    PostRetrieveSerializer,
+    ProfileListSerializer,
+    ProfileSerializer,
+)
+
+
+async def aauthenticate(request):
+    """Async equivalent of `CachedTokenAuthentication`."""
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b"token":
+        raise exceptions.NotAuthenticated()
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed(
+            "Invalid token header. Token string should not contain spaces."
+        )
+
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed("Invalid token.")
+
+    token = await aauthenticate_token(key)
+    return token.user
+
+
+def render(data, status_code=status.HTTP_200_OK) -> HttpResponse:
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json",
+    )
+
+
+def async_api_view(view):
+    """Authenticate with a token and render API errors like DRF views do."""
+
+    @require_safe
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await aauthenticate(request)
+            request = Request(request)
+            request.user = user
+            throttle = TokenBucketThrottle()
+            if not await throttle.aallow_request(request):
+                raise exceptions.Throttled(throttle.wait())
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as error:
+            response = render({"detail": error.detail}, error.status_code)
+            if isinstance(
+                error, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+            ):
+                response["WWW-Authenticate"] = "Token"
+            if isinstance(error, exceptions.Throttled) and error.wait:
+                response["Retry-After"] = "%d" % error.wait
+            return response
+        except ObjectDoesNotExist:
+            return render({"detail": "Not found."}, status.HTTP_404_NOT_FOUND)
+
+    return wrapper
+
+
+async def paginated_values(request, queryset, serializer_class, paginator):
+    renderer = ValuesRenderer.for_serializer(
+        serializer_class(context={"request": request})
+    )
+    if renderer is None:
+        raise exceptions.ParseError(
+            "Expanded fields are not available on this endpoint."
+        )
+
+    columns = list(renderer.columns)
+    for field in paginator.get_ordering(request, queryset, None):
+        if field.lstrip("-") not in columns:
+            columns.append(field.lstrip("-"))
+
+    rows = await paginator.apaginate_queryset(queryset.values(*columns), request)
+    return render(paginator.get_paginated_response(renderer.render(rows)).data)
+
+
+async def conditional_detail(request, etag_func, pk, build):
+    try:
+        etag = await etag_func(pk)
+    except (ValueError, TypeError):
+        etag = None
+    if etag is None:
+        raise exceptions.NotFound()
+
+    etag = vary_etag(
+        etag, request.query_params.get("fields"), request.query_params.get("expand")
+    )
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = render(await build())
+    response["ETag"] = etag
+    return response
+
+
+@async_api_view
+async def post_feed(request):
+    queryset = filter_posts(feed_posts(request.user.pk), request.query_params)
+    return await paginated_values(
+        request, queryset, PostListSerializer, PostCursorPagination()
+    )
+
+
+@async_api_view
+async def post_detail(request, pk):
+    async def build():
+        post = await (
+            Post.objects.select_related("user")
+            .prefetch_related("comments__user")
+            .aget(pk=pk)
+        )
+        return PostRetrieveSerializer(post, context={"request": request}).data
+
+    return await conditional_detail(request, apost_etag, pk, build)
+
+
+@async_api_view
+async def profile_list(request):
+    return await paginated_values(
+        request,
+        filter_profiles(Profile.objects.all(), request.query_params),
+        ProfileListSerializer,
+        ProfileCursorPagination(),
+    )
+
+
+@async_api_view
+async def profile_detail(request, pk):
+    async def build():
+        profile = await Profile.objects.select_related("user").aget(pk=pk)
+        limit = ProfileSerializer.inline_follows_limit
+        inline_follows = {
+            name: [
+                follow.full_name
+                async for follow in getattr(profile, name)
+                .select_related("user")
+                .order_by("id")[:limit]
+            ]
+            for name in ("following", "followers")
+        }
+        return ProfileSerializer(
+            profile,
+            context={"request": request, "inline_follows": inline_follows},
+        ).data
+
+    return await conditional_detail(request, aprofile_etag, pk, build)
+
+
+async def live_events(subscription, replay, reset):
+    try:
+        yield f"retry: {settings.LIVE_FEED_RETRY_MS}\n\n"
+        if reset:
+            yield hub.reset_event()
+        for event in replay:
+            yield event.encode()
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), settings.LIVE_FEED_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if subscription.overflowed:
+                subscription.overflowed = False
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                yield hub.reset_event()
+                continue
+            yield event.encode()
+    finally:
+        hub.unsubscribe(subscription)
+
+
+class StreamingUnavailable(exceptions.APIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = "The live feed needs the ASGI application (asgi.py)."
+    default_code = "streaming_unavailable"
+
+
+@async_api_view
+async def live_feed(request):
+    """Server-Sent Events of new posts, comments and likes from followed authors.
+
+    Reconnects resume after `Last-Event-ID` (or `?last_event_id=`), a
+    `reset` event tells the client to reload its feed instead. Only ASGI
+    servers stream the response; WSGI would buffer the endless body.
+    """
+    if not isinstance(request._request, ASGIRequest):
+        raise StreamingUnavailable()
+
+    followed = {request.user.pk}
+    async for author_id in Follow.objects.filter(
+        from_profile__user_id=request.user.pk
+    ).values_list("to_profile__user_id", flat=True):
+        followed.add(author_id)
+
+    last_event_id = request.headers.get(
+        "Last-Event-ID", request.query_params.get("last_event_id")
+    )
+    subscription, replay, reset = hub.subscribe(
+        request.user.pk, followed, last_event_id
+    )
+
+    response = StreamingHttpResponse(
+        live_events(subscription, replay, reset), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,126 @@
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from social_network.models import Post, Comment, Like, Profile
+
+BATCH_SIZE = 1000
+
+REACTION_COUNTERS = {
+    Like.ActionChoices.LIKE: "likes_count",
+    Like.ActionChoices.DISLIKE: "dislikes_count",
+}
+
+
+def reaction_deltas(previous, current) -> dict:
+    """Return counter deltas for a reaction changing from previous to current."""
+    deltas = {}
+    if previous in REACTION_COUNTERS:
+        deltas[REACTION_COUNTERS[previous]] = -1
+    if current in REACTION_COUNTERS:
+        field = REACTION_COUNTERS[current]
+        deltas[field] = deltas.get(field, 0) + 1
+    return {field: delta for field, delta in deltas.items() if delta}
+
+
+def apply_reaction(post_id: int, previous, current) -> None:
+    deltas = reaction_deltas(previous, current)
+    if deltas:
+        Post.objects.filter(pk=post_id).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+
+
+def apply_reactions(changes: dict) -> None:
+    """Apply many reaction changes, keyed by post id, in one UPDATE."""
+    deltas = {}
+    for post_id, (previous, current) in changes.items():
+        for field, delta in reaction_deltas(previous, current).items():
+            deltas.setdefault(field, {})[post_id] = delta
+    if not deltas:
+        return
+
+    post_ids = {post_id for field in deltas.values() for post_id in field}
+    Post.objects.filter(pk__in=post_ids).update(
+        **{
+            field: F(field)
+            + Case(
+                *(
+                    When(pk=post_id, then=Value(delta))
+                    for post_id, delta in by_post.items()
+                ),
+                default=Value(0),
+            )
+            for field, by_post in deltas.items()
+        }
+    )
+
+
+def increment_comments(post_id: int, delta: int = 1) -> None:
+    Post.objects.filter(pk=post_id).update(comments_count=F("comments_count") + delta)
+
+
+def _count_subquery(queryset, field="post"):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        Value(0),
+    )
+
+
+def actual_post_counters() -> dict:
+    return {
+        "likes_count": _count_subquery(
+            Like.objects.filter(action=Like.ActionChoices.LIKE)
+        ),
+        "dislikes_count": _count_subquery(
+            Like.objects.filter(action=Like.ActionChoices.DISLIKE)
+        ),
+        "comments_count": _count_subquery(Comment.objects.all()),
+    }
+
+
+def actual_profile_counters() -> dict:
+    follows = Profile.following.through.objects.all()
+    return {
+        "followers_count": _count_subquery(follows, "to_profile"),
+        "following_count": _count_subquery(follows, "from_profile"),
+    }
+
+
+def reconcile_post(post_id: int) -> None:
+    Post.objects.filter(pk=post_id).update(**actual_post_counters())
+
+
+def _reconcile(model, counters: dict) -> int:
+    drifted = Q()
+    for field in counters:
+        drifted |= ~Q(**{field: F(f"actual_{field}")})
+    object_ids = list(
+        model.objects.alias(
+            **{f"actual_{field}": expression for field, expression in counters.items()}
+        )
+        .filter(drifted)
+        .values_list("pk", flat=True)
+    )
+
+    for start in range(0, len(object_ids), BATCH_SIZE):
+        model.objects.filter(pk__in=object_ids[start : start + BATCH_SIZE]).update(
+            **counters
+        )
+
+    return len(object_ids)
+
+
+def reconcile_post_counters() -> int:
+    """Recount engagement counters for drifted posts and return their number."""
+    return _reconcile(Post, actual_post_counters())
+
+
+def reconcile_profile_counters() -> int:
+    """Recount follow counters for drifted profiles and return their number."""
+    return _reconcile(Profile, actual_profile_counters())
@@ -0,0 +1,116 @@
+import hashlib
+
+from django.db.models import Max, OuterRef, Subquery
+
+from social_network.follows import Follow
+from social_network.models import Comment, Post, Profile
+
+
+def _etag(row) -> str | None:
+    if row is None:
+        return None
+    return f'"{hashlib.md5(repr(row).encode()).hexdigest()}"'
+
+
+def vary_etag(etag: str, *variant) -> str:
+    """Derive a distinct ETag for another representation of the same data."""
+    if not any(variant):
+        return etag
+    return _etag((etag, variant))
+
+
+def _latest_user_update(queryset, user_field: str, **filters):
+    """Subquery of the latest `User.updated` among the related users whose
+    names a detail response inlines, so renaming one changes the ETag."""
+    group = next(iter(filters))
+    return Subquery(
+        queryset.filter(**filters)
+        .values(group)
+        .annotate(latest=Max(f"{user_field}__updated"))
+        .values("latest")
+    )
+
+
+def _post_validator(pk):
+    """Validator for post detail from the post row, its counters and author.
+
+    Saving the post bumps `updated`, reactions and comments change the
+    stored counters, so no comment or like rows need to be read besides
+    the latest update of a commenter.
+    """
+    return (
+        Post.objects.filter(pk=pk)
+        .annotate(
+            latest_commenter=_latest_user_update(
+                Comment.objects, "user", post_id=OuterRef("pk")
+            )
+        )
+        .values_list(
+            "updated",
+            "likes_count",
+            "dislikes_count",
+            "comments_count",
+            "image_renditions",
+            "user__first_name",
+            "user__last_name",
+            "latest_commenter",
+        )
+    )
+
+
+def post_etag(pk) -> str | None:
+    return _etag(_post_validator(pk).first())
+
+
+async def apost_etag(pk) -> str | None:
+    return _etag(await _post_validator(pk).afirst())
+
+
+def _latest_follow(**filters):
+    return Subquery(Follow.objects.filter(**filters).order_by("-id").values("id")[:1])
+
+
+def _profile_validator(pk):
+    """Validator for profile detail from the profile row and its follows.
+
+    Follow ids only grow, so the follow counts together with the latest
+    follow id change whenever the inline follow lists can change, and the
+    latest update of a followed or following user covers their names.
+    """
+    return (
+        Profile.objects.filter(pk=pk)
+        .annotate(
+            latest_following=_latest_follow(from_profile_id=OuterRef("pk")),
+            latest_follower=_latest_follow(to_profile_id=OuterRef("pk")),
+            latest_following_user=_latest_user_update(
+                Follow.objects, "to_profile__user", from_profile_id=OuterRef("pk")
+            ),
+            latest_follower_user=_latest_user_update(
+                Follow.objects, "from_profile__user", to_profile_id=OuterRef("pk")
+            ),
+        )
+        .values_list(
+            "image",
+            "image_renditions",
+            "birth_date",
+            "gender",
+            "bio",
+            "phone_number",
+            "following_count",
+            "followers_count",
+            "latest_following",
+            "latest_follower",
+            "latest_following_user",
+            "latest_follower_user",
+            "user__first_name",
+            "user__last_name",
+        )
+    )
+
+
+def profile_etag(pk) -> str | None:
+    return _etag(_profile_validator(pk).first())
+
+
+async def aprofile_etag(pk) -> str | None:
+    return _etag(await _profile_validator(pk).afirst())
@@ -0,0 +1,83 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models.fields.files import FieldFile
+
+
+def full_name(first_name, last_name) -> str:
+    return f"{first_name} {last_name}"
+
+
+def _column_converter(field):
+    to_representation = field.to_representation
+
+    def convert(value):
+        return None if value is None else to_representation(value)
+
+    return convert
+
+
+def _file_converter(field, model_field):
+    to_representation = field.to_representation
+
+    def convert(value):
+        if value is None:
+            return None
+        return to_representation(FieldFile(None, model_field, value))
+
+    return convert
+
+
+class ValuesRenderer:
+    """Build serializer output from `.values()` rows in one pass.
+
+    Fields are rendered with the serializer's own field instances, so the
+    output is identical to `serializer.data` while model instances and
+    attribute lookups are skipped. Fields that are not plain columns are
+    computed from the serializer's `values_fields`, serializers with any
+    other field (nested or method fields) are not supported.
+    """
+
+    def __init__(self, columns, steps):
+        self.columns = columns
+        self.steps = steps
+
+    @classmethod
+    def for_serializer(cls, serializer):
+        model = serializer.Meta.model
+        computed = getattr(serializer, "values_fields", {})
+        columns, steps = [], []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in computed:
+                sources, convert = computed[name]
+                steps.append((name, tuple(sources), convert))
+                columns.extend(sources)
+                continue
+
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            if model_field.is_relation:
+                return None
+
+            if isinstance(model_field, models.FileField):
+                convert = _file_converter(field, model_field)
+            else:
+                convert = _column_converter(field)
+            steps.append((name, (field.source,), convert))
+            columns.append(field.source)
+
+        return cls(list(dict.fromkeys(columns)), steps)
+
+    def render(self, rows) -> list:
+        steps = self.steps
+        return [
+            {
+                name: convert(*[row[source] for source in sources])
+                for name, sources, convert in steps
+            }
+            for row in rows
+        ]
@@ -0,0 +1,82 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from social_network.live import publish_follows
+from social_network.models import Profile
+from social_network.timeline import (
+    add_author_to_timeline,
+    remove_author_from_timeline,
+)
+
+Follow = Profile.following.through
+
+
+def _update_counters(pairs, delta: int) -> None:
+    following = Counter(follower.pk for follower, _ in pairs)
+    followers = Counter(author.pk for _, author in pairs)
+    for pk, count in following.items():
+        Profile.objects.filter(pk=pk).update(
+            following_count=F("following_count") + count * delta
+        )
+    for pk, count in followers.items():
+        Profile.objects.filter(pk=pk).update(
+            followers_count=F("followers_count") + count * delta
+        )
+
+
+def follows_added(pairs) -> None:
+    """Update counters and timelines for new (follower, author) profile pairs."""
+    _update_counters(pairs, 1)
+    for follower, author in pairs:
+        add_author_to_timeline(follower.user_id, author.user_id)
+    publish_follows(pairs, added=True)
+
+
+def follows_removed(pairs) -> None:
+    _update_counters(pairs, -1)
+    for follower, author in pairs:
+        remove_author_from_timeline(follower.user_id, author.user_id)
+    publish_follows(pairs, added=False)
+
+
+def is_following(profile: Profile, target: Profile) -> bool:
+    return Follow.objects.filter(
+        from_profile_id=profile.pk, to_profile_id=target.pk
+    ).exists()
+
+
+def follow(profile: Profile, target: Profile) -> bool:
+    """Follow target with a single insert, return False if already following."""
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                Follow.objects.create(
+                    from_profile_id=profile.pk, to_profile_id=target.pk
+                )
+        except IntegrityError:
+            return False
+        follows_added([(profile, target)])
+    return True
+
+
+def unfollow(profile: Profile, target: Profile) -> bool:
+    """Unfollow target with a single delete, return False if not following."""
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(
+            from_profile_id=profile.pk, to_profile_id=target.pk
+        ).delete()
+        if not deleted:
+            return False
+        follows_removed([(profile, target)])
+    return True
+
+
+def toggle_follow(profile: Profile, target: Profile) -> bool:
+    """Follow or unfollow target, return whether profile now follows it."""
+    if is_following(profile, target):
+        unfollow(profile, target)
+        return False
+    follow(profile, target)
+    return True
@@ -0,0 +1,95 @@
+# No Django imports here: pool workers must be able to import this module
+# under any multiprocessing start method.
+
+import heapq
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+_graph = None
+
+
+class FollowGraph:
+    """Follow graph in CSR form: node ids plus offsets into followed nodes."""
+
+    def __init__(self, ids: array, offsets: array, targets: array):
+        self.ids = ids
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_edges(cls, ids, edges):
+        """Build from sorted node ids and (from_id, to_id) edges sorted by from_id.
+
+        Edges with an endpoint missing from ids are skipped: ids and edges
+        are read separately, so follows of profiles created in between show
+        up without their nodes.
+        """
+        ids = array("q", ids)
+        position = {node_id: index for index, node_id in enumerate(ids)}
+        offsets = array("q", bytes(8 * (len(ids) + 1)))
+        targets = array("q")
+
+        for from_id, to_id in edges:
+            source, target = position.get(from_id), position.get(to_id)
+            if source is None or target is None:
+                continue
+            offsets[source + 1] += 1
+            targets.append(target)
+        for index in range(len(ids)):
+            offsets[index + 1] += offsets[index]
+
+        return cls(ids, offsets, targets)
+
+    def following(self, node: int) -> array:
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def suggest(self, node: int, top_k: int) -> list:
+        """Rank nodes followed by followed nodes that node does not follow yet."""
+        following = self.following(node)
+        excluded = set(following)
+        excluded.add(node)
+
+        scores = {}
+        for followed in following:
+            for candidate in self.following(followed):
+                if candidate not in excluded:
+                    scores[candidate] = scores.get(candidate, 0) + 1
+
+        best = heapq.nlargest(
+            top_k, scores.items(), key=lambda item: (item[1], -item[0])
+        )
+        return [(self.ids[candidate], score) for candidate, score in best]
+
+
+def _init_worker(graph: FollowGraph) -> None:
+    global _graph
+    _graph = graph
+
+
+def _suggest_range(task) -> list:
+    start, stop, top_k = task
+    return [
+        (_graph.ids[node], suggested_id, score)
+        for node in range(start, stop)
+        for suggested_id, score in _graph.suggest(node, top_k)
+    ]
+
+
+def compute_suggestions(graph: FollowGraph, top_k: int, workers: int, chunk_size=500):
+    """Yield (profile_id, suggested_id, score) for every node in the graph."""
+    tasks = [
+        (start, min(start + chunk_size, len(graph.ids)), top_k)
+        for start in range(0, len(graph.ids), chunk_size)
+    ]
+
+    if workers <= 1:
+        _init_worker(graph)
+        for task in tasks:
+            yield from _suggest_range(task)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(graph,)
+    ) as executor:
+        for rows in executor.map(_suggest_range, tasks):
+            yield from rows
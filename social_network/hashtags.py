@@ -0,0 +1,44 @@
+import re
+
+from social_network.models import Hashtag, Post, PostHashtag
+
+HASHTAG_RE = re.compile(r"#?(\w+)")
+MAX_LENGTH = Hashtag._meta.get_field("name").max_length
+
+
+def parse_hashtags(value) -> list:
+    """Split a free-form hashtags string into unique lowercase tag names."""
+    names = (name[:MAX_LENGTH] for name in HASHTAG_RE.findall((value or "").lower()))
+    return list(dict.fromkeys(names))
+
+
+def get_or_create_hashtags(names) -> dict:
+    hashtags = dict(Hashtag.objects.filter(name__in=names).values_list("name", "id"))
+    missing = [name for name in names if name not in hashtags]
+    if missing:
+        Hashtag.objects.bulk_create(
+            [Hashtag(name=name) for name in missing], ignore_conflicts=True
+        )
+        hashtags.update(
+            Hashtag.objects.filter(name__in=missing).values_list("name", "id")
+        )
+    return hashtags
+
+
+def sync_post_hashtags(post: Post) -> list:
+    """Make the post's tag relation match its hashtags text, return tag ids."""
+    hashtag_ids = list(get_or_create_hashtags(parse_hashtags(post.hashtags)).values())
+
+    PostHashtag.objects.filter(post=post).exclude(hashtag_id__in=hashtag_ids).delete()
+    PostHashtag.objects.bulk_create(
+        [PostHashtag(post=post, hashtag_id=hashtag_id) for hashtag_id in hashtag_ids],
+        ignore_conflicts=True,
+    )
+    return hashtag_ids
+
+
+def filter_posts_by_hashtags(queryset, value):
+    names = parse_hashtags(value)
+    return queryset.filter(
+        id__in=PostHashtag.objects.filter(hashtag__name__in=names).values("post_id")
+    )
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    id: str
+    sequence: int
+    kind: str
+    author_id: int
+    data: dict
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.kind}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class Subscription:
+    """A live feed connection, fed from any thread into its event loop."""
+
+    def __init__(self, user_id: int, followed: set, max_pending: int):
+        self.user_id = user_id
+        self.followed = followed
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+    def deliver(self, event: LiveEvent) -> None:
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def follow_changed(self, author_id: int, added: bool) -> None:
+        update = self.followed.add if added else self.followed.discard
+        self.loop.call_soon_threadsafe(update, author_id)
+
+    def wants(self, event: LiveEvent) -> bool:
+        return event.author_id in self.followed
+
+    def _put(self, event: LiveEvent) -> None:
+        if not self.wants(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class LiveHub:
+    """In-process broadcast of feed events with a replay buffer.
+
+    Event ids carry a per-process boot id, so a `Last-Event-ID` from another
+    process or from before the buffer window is answered with a reset.
+    """
+
+    def __init__(self, buffer_size: int, max_pending: int):
+        self.boot = uuid.uuid4().hex[:8]
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._buffer = deque(maxlen=buffer_size)
+        self._subscribers = set()
+
+    def publish(self, kind: str, author_id: int, data: dict) -> None:
+        with self._lock:
+            self._sequence += 1
+            event = LiveEvent(
+                f"{self.boot}-{self._sequence}",
+                self._sequence,
+                kind,
+                author_id,
+                data,
+            )
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def follow_changed(self, user_id: int, author_id: int, added: bool) -> None:
+        with self._lock:
+            subscribers = [s for s in self._subscribers if s.user_id == user_id]
+        for subscription in subscribers:
+            subscription.follow_changed(author_id, added)
+
+    def _replay(self, last_event_id: str | None):
+        """Return (events after last_event_id, whether the client must reset)."""
+        if not last_event_id:
+            return [], False
+
+        boot, _, sequence = last_event_id.partition("-")
+        if boot != self.boot or not sequence.isdigit():
+            return [], True
+        sequence = int(sequence)
+        oldest = self._buffer[0].sequence if self._buffer else self._sequence + 1
+        if sequence < oldest - 1 or sequence > self._sequence:
+            return [], True
+        return [event for event in self._buffer if event.sequence > sequence], False
+
+    def subscribe(self, user_id: int, followed: set, last_event_id=None):
+        """Register a subscription, return it with the events to replay first."""
+        subscription = Subscription(user_id, followed, self.max_pending)
+        with self._lock:
+            replay, reset = self._replay(last_event_id)
+            self._subscribers.add(subscription)
+        return subscription, [e for e in replay if subscription.wants(e)], reset
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def reset_event(self) -> str:
+        with self._lock:
+            event_id = f"{self.boot}-{self._sequence}"
+        return f"id: {event_id}\nevent: reset\ndata: {{}}\n\n"
+
+
+hub = LiveHub(
+    buffer_size=getattr(settings, "LIVE_FEED_BUFFER_SIZE", 1000),
+    max_pending=getattr(settings, "LIVE_FEED_MAX_PENDING", 1000),
+)
+
+
+def publish_on_commit(kind: str, author_id: int, data: dict) -> None:
+    transaction.on_commit(lambda: hub.publish(kind, author_id, data))
+
+
+def publish_post(post) -> None:
+    publish_on_commit(
+        "post",
+        post.user_id,
+        {
+            "id": post.pk,
+            "title": post.title,
+            "user": post.user.full_name,
+            "created": post.created.isoformat(),
+        },
+    )
+
+
+def publish_comment(comment) -> None:
+    publish_on_commit(
+        "comment",
+        comment.post.user_id,
+        {
+            "id": comment.pk,
+            "post_id": comment.post_id,
+            "user": comment.user.full_name,
+            "text": comment.text,
+            "created": comment.created.isoformat(),
+        },
+    )
+
+
+def publish_reaction(author_id: int, post_id: int, user_id: int, action: str) -> None:
+    publish_on_commit(
+        "like", author_id, {"post_id": post_id, "user_id": user_id, "action": action}
+    )
+
+
+def publish_follows(pairs, added: bool) -> None:
+    pairs = [(follower.user_id, author.user_id) for follower, author in pairs]
+    transaction.on_commit(
+        lambda: [hub.follow_changed(*pair, added=added) for pair in pairs]
+    )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from social_network.hashtags import sync_post_hashtags
+from social_network.models import Post
+
+
+class Command(BaseCommand):
+    help = "Parse hashtags of existing posts into the Hashtag relation"
+
+    def handle(self, *args, **options):
+        posts = 0
+        for post in Post.objects.only("id", "hashtags").iterator(chunk_size=1000):
+            with transaction.atomic():
+                sync_post_hashtags(post)
+            posts += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {posts} post(s)."))
@@ -0,0 +1,122 @@
+import asyncio
+import statistics
+import time
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+
+ENDPOINTS = {
+    "feed": "posts/",
+    "profiles": "profiles/",
+}
+
+
+async def asgi_get(application, path: str, headers) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "server": ("localhost", 80),
+        # Outside INTERNAL_IPS so the debug toolbar stays out of the numbers.
+        "client": ("192.0.2.1", 0),
+    }
+    body_sent = False
+    disconnected = asyncio.Event()
+    statuses = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return statuses[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare sync and async read endpoints under concurrent requests "
+        "through the ASGI application"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", required=True, help="Email of the user to authenticate as"
+        )
+        parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="feed")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+
+    async def run(self, application, path, headers, total, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, failures = [], 0
+
+        async def one():
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                status = await asgi_get(application, path, headers)
+                latencies.append(time.perf_counter() - start)
+                failures += status != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        return {
+            "rps": total / elapsed,
+            "p50": statistics.median(latencies) * 1000,
+            "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+            "failures": failures,
+        }
+
+    def handle(self, *args, **options):
+        token = Token.objects.filter(user__email=options["user"]).first()
+        if token is None:
+            raise CommandError("The user has no authentication token.")
+
+        application = get_asgi_application()
+        headers = [
+            (b"host", b"localhost"),
+            (b"authorization", f"Token {token.key}".encode()),
+        ]
+        endpoint = ENDPOINTS[options["endpoint"]]
+
+        # Every request comes from one user and would soon be throttled.
+        with override_settings(RATE_LIMITS={}):
+            for name, prefix in (
+                ("sync", "/api/social-network/"),
+                ("async", "/api/social-network/async/"),
+            ):
+                result = asyncio.run(
+                    self.run(
+                        application,
+                        prefix + endpoint,
+                        headers,
+                        options["requests"],
+                        options["concurrency"],
+                    )
+                )
+                self.stdout.write(
+                    f"{name:>5}: {result['rps']:,.0f} req/s, "
+                    f"p50 {result['p50']:.1f} ms, p95 {result['p95']:.1f} ms, "
+                    f"{result['failures']} failed"
+                )
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from social_network.fast_lists import ValuesRenderer
+from social_network.models import Post, Profile
+from social_network.serializers import PostListSerializer, ProfileListSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare rows per second of serializer and .values() list rendering"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=1000, help="Rows rendered per run"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Runs per path, best is reported"
+        )
+
+    def best_rate(self, render, repeat):
+        best, rows = 0.0, 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = len(render())
+            elapsed = time.perf_counter() - start
+            best = max(best, rows / elapsed if elapsed else 0.0)
+        return rows, best
+
+    def handle(self, *args, **options):
+        context = {"request": Request(RequestFactory().get("/"))}
+        cases = (
+            (Post.objects.order_by("-created", "-id"), PostListSerializer),
+            (Profile.objects.order_by("id"), ProfileListSerializer),
+        )
+
+        for queryset, serializer_class in cases:
+            queryset = queryset[: options["rows"]]
+            renderer = ValuesRenderer.for_serializer(serializer_class(context=context))
+
+            rows, serializer_rate = self.best_rate(
+                lambda: serializer_class(
+                    queryset.select_related("user"), many=True, context=context
+                ).data,
+                options["repeat"],
+            )
+            _, values_rate = self.best_rate(
+                lambda: renderer.render(queryset.values(*renderer.columns)),
+                options["repeat"],
+            )
+
+            self.stdout.write(
+                f"{serializer_class.__name__}: {rows} rows, "
+                f"serializer {serializer_rate:,.0f} rows/s, "
+                f"values {values_rate:,.0f} rows/s "
+                f"({values_rate / serializer_rate if serializer_rate else 0:.1f}x)"
+            )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from social_network.reactions import collapse_duplicate_reactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Keep only the latest reaction of each user to a post. Run before "
+        "applying the migration that adds the unique_like constraint."
+    )
+
+    def handle(self, *args, **options):
+        deleted = collapse_duplicate_reactions()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} duplicate reaction(s).")
+        )
+        if deleted:
+            self.stdout.write("Run reconcile_counters once migrations are applied.")
@@ -0,0 +1,27 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from social_network.suggestions import rebuild_suggestions
+
+
+class Command(BaseCommand):
+    help = "Compute 'people you may know' suggestions from the follow graph"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=20,
+            help="Number of suggestions stored per profile",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes",
+        )
+
+    def handle(self, *args, **options):
+        stored = rebuild_suggestions(options["top_k"], options["workers"])
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} suggestion(s)."))
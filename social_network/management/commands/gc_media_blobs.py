@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Delete stored media blobs that are no longer referenced"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-period",
+            type=int,
+            default=settings.MEDIA_BLOB_GC_GRACE_PERIOD,
+            help="Seconds a blob must be unreferenced before it is deleted",
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(default_storage, "collect_garbage"):
+            raise CommandError("The default storage is not content-addressed.")
+
+        collected = default_storage.collect_garbage(
+            timedelta(seconds=options["grace_period"])
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {collected} blob(s)."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from social_network.models import Post, Profile
+from social_network.renditions import generate_renditions
+
+
+class Command(BaseCommand):
+    help = "Generate missing or stale image renditions for posts and profiles"
+
+    def handle(self, *args, **options):
+        generated = 0
+        for model in (Profile, Post):
+            images = model.objects.exclude(image="").exclude(image__isnull=True)
+            for pk, image, renditions in images.values_list(
+                "pk", "image", "image_renditions"
+            ).iterator(chunk_size=1000):
+                if renditions.get("source") != image:
+                    generated += generate_renditions(model, pk)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated renditions for {generated} image(s).")
+        )
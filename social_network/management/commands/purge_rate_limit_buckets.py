@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from social_network.throttling import DatabaseBackend
+
+
+class Command(BaseCommand):
+    help = "Delete database rate limit buckets that have not been used recently"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="Maximum idle time of a bucket in hours",
+        )
+
+    def handle(self, *args, **options):
+        purged = DatabaseBackend().purge(options["hours"] * 3600)
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} bucket(s)."))
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from social_network.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked uploads older than the given age"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="Maximum age of an upload in hours",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_stale_uploads(timedelta(hours=options["hours"]))
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} upload(s)."))
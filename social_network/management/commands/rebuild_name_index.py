@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from social_network.search import rebuild_name_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the profile name prefix index used by autocomplete"
+
+    def handle(self, *args, **options):
+        profiles = rebuild_name_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {profiles} profile(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from social_network.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Backfill the full-text search index for existing posts"
+
+    def handle(self, *args, **options):
+        posts = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {posts} post(s)."))
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from social_network.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Rebuild materialized home timelines from posts and follows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            type=int,
+            dest="user_ids",
+            help="Rebuild only the timeline of the given user id (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options["user_ids"] or get_user_model().objects.values_list(
+            "id", flat=True
+        )
+        rebuilt = 0
+        for user_id in user_ids:
+            with transaction.atomic():
+                rebuild_timeline(user_id)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} timeline(s)."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from social_network.counters import (
+    reconcile_post_counters,
+    reconcile_profile_counters,
+)
+
+
+class Command(BaseCommand):
+    help = "Repair drift in denormalized engagement counters"
+
+    def handle(self, *args, **options):
+        posts = reconcile_post_counters()
+        profiles = reconcile_profile_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled {posts} post(s) and {profiles} profile(s).")
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from social_network.trending import rollup_counters
+
+
+class Command(BaseCommand):
+    help = "Roll up minute hashtag counters into hours and prune expired hours"
+
+    def handle(self, *args, **options):
+        rolled_up, pruned = rollup_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rolled up {rolled_up} minute bucket(s), "
+                f"pruned {pruned} hour bucket(s)."
+            )
+        )
@@ -0,0 +1,146 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+STREAM_BLOCK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int):
+    """Return (start, end) of a single byte range, None to ignore, or False
+    when the range cannot be satisfied."""
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+
+    start, end = match.groups()
+    if not start:
+        if not end or int(end) == 0:
+            return False
+        return max(size - int(end), 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def range_applies(request, etag: str, last_modified: int) -> bool:
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def stream_range(path: str, start: int, length: int):
+    with open(path, "rb") as media_file:
+        media_file.seek(start)
+        while length > 0:
+            block = media_file.read(min(STREAM_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def offload_response(path: str, name: str) -> HttpResponse:
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE == "x-accel-redirect":
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + name
+    else:
+        response["X-Sendfile"] = path
+    # Let the proxy pick the content type and answer ranges itself.
+    del response["Content-Type"]
+    return response
+
+
+def build_response(request, full_path, name, size, etag, last_modified):
+    if settings.MEDIA_SENDFILE:
+        return offload_response(full_path, name)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    byte_range = None
+    if "Range" in request.headers and range_applies(request, etag, last_modified):
+        byte_range = parse_range(request.headers["Range"], size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type)
+        response["Content-Length"] = size
+    elif byte_range is None:
+        response = FileResponse(open(full_path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            stream_range(full_path, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a media file with conditional GET, byte ranges and optional
+    X-Sendfile/X-Accel-Redirect offload to the front proxy."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, ValueError):
+        raise Http404("File does not exist.")
+    if not os.path.isfile(full_path):
+        raise Http404("File does not exist.")
+
+    name = path.replace(os.sep, "/")
+    last_modified = int(stat.st_mtime)
+    is_blob = getattr(default_storage, "is_blob", lambda name: False)(name)
+    if is_blob:
+        etag = f'"{os.path.splitext(os.path.basename(name))[0]}"'
+    else:
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build_response(
+            request, full_path, name, stat.st_size, etag, last_modified
+        )
+        if response.status_code == 416:
+            return response
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    if is_blob:
+        # Blob names change with their content, so they never go stale.
+        patch_cache_control(
+            response, public=True, max_age=365 * 24 * 60 * 60, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
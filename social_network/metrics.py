@@ -0,0 +1,235 @@
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Per series: request count, latency sum, query count, query seconds,
+# response bytes, then one (non-cumulative) count per latency bucket and +Inf.
+COUNT, LATENCY, QUERIES, QUERY_TIME, BYTES, BUCKETS = range(6)
+
+# Anything else is reported as "other" so clients cannot add label values.
+KNOWN_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT")
+)
+
+_queries = ContextVar("request_queries", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding to the current request's query stats."""
+    stats = _queries.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start
+
+
+class MetricsRegistry:
+    """Request metrics of this process, periodically written to its own file.
+
+    With `METRICS_DIR` set every worker process writes a file there and the
+    metrics endpoint of any worker sums all of them, the way Prometheus
+    client libraries aggregate multi-process servers.
+    """
+
+    def __init__(self):
+        self.buckets = tuple(
+            getattr(settings, "METRICS_LATENCY_BUCKETS", DEFAULT_LATENCY_BUCKETS)
+        )
+        self.directory = getattr(settings, "METRICS_DIR", None)
+        self.flush_interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # Also called in a forked worker, which must not reuse its parent's file.
+        self.pid = os.getpid()
+        self.path = self.directory and os.path.join(
+            self.directory, f"{self.pid}-{uuid.uuid4().hex[:8]}.json"
+        )
+        self.series = {}
+        self.flushed = time.monotonic()
+
+    def observe(self, labels, latency, queries, query_time, size) -> None:
+        with self._lock:
+            if os.getpid() != self.pid:
+                self._reset()
+            values = self.series.get(labels)
+            if values is None:
+                values = self.series[labels] = [0] * (BUCKETS + len(self.buckets) + 1)
+            values[COUNT] += 1
+            values[LATENCY] += latency
+            values[QUERIES] += queries
+            values[QUERY_TIME] += query_time
+            values[BYTES] += size
+            values[BUCKETS + bisect_left(self.buckets, latency)] += 1
+            due = time.monotonic() - self.flushed >= self.flush_interval
+            if due:
+                self.flushed = time.monotonic()
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = [[*labels, values] for labels, values in self.series.items()]
+            self.flushed = time.monotonic()
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as metrics_file:
+            json.dump(data, metrics_file)
+        os.replace(temporary, self.path)
+
+    def collect(self) -> dict:
+        """Sum the series of every process writing to the metrics directory."""
+        with self._lock:
+            total = {labels: list(values) for labels, values in self.series.items()}
+        if not self.directory or not os.path.isdir(self.directory):
+            return total
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".json") or path == self.path:
+                continue
+            try:
+                with open(path) as metrics_file:
+                    rows = json.load(metrics_file)
+            except (OSError, ValueError):
+                continue
+            for *labels, values in rows:
+                current = total.setdefault(tuple(labels), [0] * len(values))
+                for index, value in enumerate(values):
+                    current[index] += value
+        return total
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics(series: dict, buckets) -> str:
+    lines = [
+        "# HELP http_request_duration_seconds Request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    totals = {
+        "http_request_db_queries_total": (
+            QUERIES,
+            "Database queries run by requests.",
+        ),
+        "http_request_db_query_seconds_total": (
+            QUERY_TIME,
+            "Time spent in database queries by requests.",
+        ),
+        "http_response_bytes_total": (BYTES, "Response body bytes sent."),
+    }
+    rows = [
+        (
+            f'route="{_escape(route)}",method="{_escape(method)}",status="{status}"',
+            values,
+        )
+        for (route, method, status), values in sorted(series.items())
+    ]
+
+    histogram = "http_request_duration_seconds"
+    for labels, values in rows:
+        cumulative = 0
+        for bound, count in zip(
+            [*map(str, buckets), "+Inf"], values[BUCKETS:], strict=True
+        ):
+            cumulative += count
+            lines.append(f'{histogram}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{histogram}_sum{{{labels}}} {values[LATENCY]}")
+        lines.append(f"{histogram}_count{{{labels}}} {values[COUNT]}")
+
+    for name, (index, description) in totals.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, values in rows:
+            lines.append(f"{name}{{{labels}}} {values[index]}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    return HttpResponse(
+        render_metrics(registry.collect(), registry.buckets),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+class MetricsMiddleware:
+    """Record latency, database queries and response size per resolved route.
+
+    Queries are counted by `record_query`, installed on every database
+    connection, through a context variable that follows the request into
+    `sync_to_async` threads. Streaming responses count their Content-Length
+    if they set one, and their latency ends when streaming starts.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, start, token = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self._finish(request, response, stats, start)
+        return response
+
+    async def __acall__(self, request):
+        stats, start, token = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self._finish(request, response, stats, start)
+        return response
+
+    def _start(self):
+        stats = [0, 0.0]
+        return stats, time.perf_counter(), _queries.set(stats)
+
+    def _finish(self, request, response, stats, start):
+        latency = time.perf_counter() - start
+        match = request.resolver_match
+        route = match.view_name if match else "unmatched"
+        method = request.method if request.method in KNOWN_METHODS else "other"
+        if response.streaming:
+            size = int(response.get("Content-Length", 0))
+        else:
+            size = len(response.content)
+        registry.observe(
+            (route, method, str(response.status_code)),
+            latency,
+            stats[0],
+            stats[1],
+            size,
+        )
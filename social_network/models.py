@@ -1,6 +1,7 @@
 import os
 import uuid
 
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 from django.db import models
 from social_media_api import settings
@@ -24,6 +25,7 @@ class Profile(models.Model):
         related_name="profile",
     )
     image = models.ImageField(null=True, upload_to=image_file_path)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     birth_date = models.DateField(null=True, blank=True)
     gender = models.CharField(max_length=15, choices=GenderChoices.choices)
     bio = models.TextField(max_length=255, null=True, blank=True)
@@ -31,6 +33,8 @@ class Profile(models.Model):
     following = models.ManyToManyField(
         "self", blank=True, symmetrical=False, related_name="followers"
     )
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     @property
     def full_name(self) -> str:
@@ -39,6 +43,51 @@ class Profile(models.Model):
     def __str__(self):
         return str(self.user.full_name)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-followers_count", "id"], name="profile_followers_count_idx"
+            ),
+        ]
+
+
+class ProfileNameToken(models.Model):
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="name_tokens"
+    )
+    token = models.CharField(max_length=150)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "token"], name="unique_profile_name_token"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["token", "profile"], name="profile_name_token_idx"),
+        ]
+
+
+class ProfileSuggestion(models.Model):
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="suggestions"
+    )
+    suggested = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="suggested_to"
+    )
+    score = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["-score"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "suggested"], name="unique_profile_suggestion"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["profile", "-score"], name="suggestion_score_idx"),
+        ]
+
 
 class Post(models.Model):
     user = models.ForeignKey(
@@ -47,21 +96,78 @@ class Post(models.Model):
         related_name="posts",
     )
     image = models.ImageField(null=True, upload_to=image_file_path, blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     title = models.CharField(max_length=255)
     text = models.TextField()
     hashtags = models.CharField(max_length=125, null=True, blank=True)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    likes_count = models.PositiveIntegerField(default=0)
+    dislikes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
+    tags = models.ManyToManyField(
+        "Hashtag", through="PostHashtag", related_name="posts", blank=True
+    )
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            models.Index(fields=["-created", "-id"], name="post_created_id_idx"),
+            models.Index(
+                fields=["user", "-created", "-id"], name="post_user_created_id_idx"
+            ),
+        ]
 
-    @property
-    def comments_count(self):
-        return self.comments.count()
+
+class Hashtag(models.Model):
+    name = models.CharField(max_length=125, unique=True)
+
+    def __str__(self):
+        return f"#{self.name}"
+
+    class Meta:
+        ordering = ["name"]
+
+
+class PostHashtag(models.Model):
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="post_hashtags"
+    )
+    hashtag = models.ForeignKey(
+        Hashtag, on_delete=models.CASCADE, related_name="post_hashtags"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hashtag", "post"], name="unique_post_hashtag"
+            ),
+        ]
+
+
+class HashtagCounter(models.Model):
+    class GranularityChoices(models.TextChoices):
+        MINUTE = "minute"
+        HOUR = "hour"
+
+    hashtag = models.ForeignKey(
+        Hashtag, on_delete=models.CASCADE, related_name="counters"
+    )
+    granularity = models.CharField(max_length=6, choices=GranularityChoices.choices)
+    bucket = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["granularity", "bucket", "hashtag"],
+                name="unique_hashtag_counter",
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -77,6 +183,9 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            models.Index(fields=["-created", "-id"], name="comment_created_id_idx"),
+        ]
 
 
 class Like(models.Model):
@@ -92,3 +201,88 @@ class Like(models.Model):
         related_name="likes",
     )
     action = models.CharField(max_length=15, choices=ActionChoices.choices)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="unique_like"),
+        ]
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    created = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="unique_timeline_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created", "-post"], name="timeline_user_created_idx"
+            ),
+        ]
+
+
+class Upload(models.Model):
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending"
+        COMPLETE = "complete"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="uploads",
+    )
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(
+        max_length=15, choices=StatusChoices.choices, default=StatusChoices.PENDING
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.filename
+
+
+class RateLimitBucket(models.Model):
+    key = models.CharField(max_length=255, unique=True)
+    tokens = models.FloatField()
+    updated = models.FloatField()
+    allowed = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["updated"])]
+
+    def __str__(self):
+        return self.key
+
+
+class MediaBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    released = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["released"],
+                condition=models.Q(refcount=0),
+                name="mediablob_unreferenced_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,114 @@
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class BaseCursorPagination(CursorPagination):
+    """Cursor pagination split around the page query so the page can also be
+    fetched with the async ORM through `apaginate_queryset`."""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def _page_queryset(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            order = self.ordering[0]
+            order_attr = order.lstrip("-")
+            if self.cursor.reverse != order.startswith("-"):
+                queryset = queryset.filter(**{order_attr + "__lt": current_position})
+            else:
+                queryset = queryset.filter(**{order_attr + "__gt": current_position})
+
+        # One extra item tells whether a following page exists.
+        return queryset[offset : offset + self.page_size + 1]
+
+    def _set_page(self, results):
+        offset, reverse, current_position = self.cursor or (0, False, None)
+        self.page = list(results[: self.page_size])
+
+        has_following_position = len(results) > len(self.page)
+        following_position = None
+        if has_following_position:
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self._set_page([item async for item in queryset])
+
+
+class PostCursorPagination(BaseCursorPagination):
+    ordering = ("-created", "-id")
+    search_ordering = ("-search_rank", "-id")
+    # Feed querysets annotated by `feed_posts` page over timeline entry
+    # columns, so the (user, -created, -post) index serves order and cursor.
+    feed_ordering = ("-feed_created", "-feed_post")
+
+    def get_ordering(self, request, queryset, view):
+        if "search_rank" in queryset.query.annotations:
+            return self.search_ordering
+        if "feed_created" in queryset.query.annotations:
+            return self.feed_ordering
+        return super().get_ordering(request, queryset, view)
+
+
+class CommentCursorPagination(BaseCursorPagination):
+    ordering = ("-created", "-id")
+
+
+class LikeCursorPagination(BaseCursorPagination):
+    ordering = ("-id",)
+
+
+class ProfileCursorPagination(BaseCursorPagination):
+    ordering = ("id",)
+
+
+class HashtagCursorPagination(BaseCursorPagination):
+    ordering = ("name",)
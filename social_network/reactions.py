@@ -0,0 +1,138 @@
+from django.db import connection, transaction
+from django.db.models import Max
+
+from social_network.counters import apply_reaction, apply_reactions, reconcile_post
+from social_network.live import publish_reaction
+from social_network.models import Like, Post
+
+LIKE_TABLE = Like._meta.db_table
+
+UPSERT_SQL = (
+    f"INSERT INTO {LIKE_TABLE} (user_id, post_id, action) VALUES (%s, %s, %s) "
+    "ON CONFLICT (user_id, post_id) DO UPDATE SET action = EXCLUDED.action "
+    f"WHERE {LIKE_TABLE}.action <> EXCLUDED.action "
+)
+
+# Every statement of a PostgreSQL WITH query sees the same snapshot, so the
+# CTE reads the reaction as it was before the upsert changed it.
+POSTGRES_UPSERT_SQL = (
+    "WITH previous AS ("
+    f"SELECT action FROM {LIKE_TABLE} WHERE user_id = %s AND post_id = %s"
+    ") " + UPSERT_SQL + "RETURNING id, xmax = 0, (SELECT action FROM previous)"
+)
+
+
+def _upsert_postgresql(user_id, post_id, action):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            POSTGRES_UPSERT_SQL, [user_id, post_id, user_id, post_id, action]
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    like_id, inserted, previous = row
+    if not inserted and previous is None:
+        # A concurrent transaction created the reaction after our snapshot.
+        reconcile_post(post_id)
+        return like_id, action
+    return like_id, previous
+
+
+def _upsert(user_id, post_id, action):
+    previous = (
+        Like.objects.filter(user_id=user_id, post_id=post_id)
+        .values_list("action", flat=True)
+        .first()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_SQL + "RETURNING id", [user_id, post_id, action])
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return row[0], previous
+
+
+def set_reaction(user_id: int, post_id: int, action: str, author_id=None):
+    """Create or change a user's reaction with a single upsert.
+
+    Returns the reaction id, or None when the reaction already had this
+    action. PostgreSQL writes in one statement; other backends read the
+    previous action first since they cannot return it from the upsert.
+    """
+    upsert = _upsert_postgresql if connection.vendor == "postgresql" else _upsert
+
+    with transaction.atomic():
+        result = upsert(user_id, post_id, action)
+        if result is None:
+            return None
+
+        like_id, previous = result
+        apply_reaction(post_id, previous, action)
+
+        if author_id is None:
+            author_id = Post.objects.values_list("user_id", flat=True).get(pk=post_id)
+        publish_reaction(author_id, post_id, user_id, action)
+
+    return like_id
+
+
+def set_reactions(user_id: int, items) -> list:
+    """Apply a batch of (post_id, action) reactions in a constant number of queries.
+
+    Items are applied in order, so a later reaction to the same post wins.
+    Returns a status per item: created, updated, unchanged or not_found.
+    """
+    with transaction.atomic():
+        authors = dict(
+            Post.objects.filter(id__in={post_id for post_id, _ in items}).values_list(
+                "id", "user_id"
+            )
+        )
+        post_ids = set(authors)
+        previous = dict(
+            Like.objects.select_for_update()
+            .filter(user_id=user_id, post_id__in=post_ids)
+            .values_list("post_id", "action")
+        )
+
+        current, statuses = dict(previous), []
+        for post_id, action in items:
+            if post_id not in post_ids:
+                statuses.append("not_found")
+            elif current.get(post_id) == action:
+                statuses.append("unchanged")
+            else:
+                statuses.append("created" if post_id not in current else "updated")
+                current[post_id] = action
+
+        changes = {
+            post_id: (previous.get(post_id), action)
+            for post_id, action in current.items()
+            if previous.get(post_id) != action
+        }
+        Like.objects.bulk_create(
+            [
+                Like(user_id=user_id, post_id=post_id, action=action)
+                for post_id, (_, action) in changes.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "post"],
+            update_fields=["action"],
+        )
+        apply_reactions(changes)
+        for post_id, (_, action) in changes.items():
+            publish_reaction(authors[post_id], post_id, user_id, action)
+
+    return statuses
+
+
+def collapse_duplicate_reactions() -> int:
+    """Delete all but the latest reaction of each user to each post.
+
+    Databases written before the `unique_like` constraint can hold racing
+    duplicates, which must go before the constraint can be added.
+    """
+    latest_ids = Like.objects.values("user_id", "post_id").annotate(latest_id=Max("id"))
+    deleted, _ = Like.objects.exclude(id__in=latest_ids.values("latest_id")).delete()
+    return deleted
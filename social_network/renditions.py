@@ -0,0 +1,113 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS = {
+    "thumbnail": {"size": (150, 150), "format": "JPEG", "extension": "jpg"},
+    "medium": {"size": (800, 800), "format": "JPEG", "extension": "jpg"},
+    "webp": {"size": None, "format": "WEBP", "extension": "webp"},
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "IMAGE_RENDITION_WORKERS", 2),
+    thread_name_prefix="image-renditions",
+)
+
+
+def rendition_name(source: str, rendition: str) -> str:
+    root, _ = os.path.splitext(source)
+    return f"{root}-{rendition}.{RENDITIONS[rendition]['extension']}"
+
+
+def render(image: Image.Image, rendition: str) -> bytes:
+    spec = RENDITIONS[rendition]
+    image = image.copy()
+    if spec["size"]:
+        image.thumbnail(spec["size"])
+    if spec["format"] == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, format=spec["format"])
+    return buffer.getvalue()
+
+
+def stored_files(image: str, renditions: dict) -> set:
+    names = {name for key, name in renditions.items() if key != "source"}
+    if image:
+        names.add(image)
+    return names
+
+
+def release_files(storage, names) -> None:
+    """Delete files from storage once the transaction dropping them commits."""
+    names = list(names)
+    transaction.on_commit(lambda: [storage.delete(name) for name in names])
+
+
+def generate_renditions(model, pk) -> bool:
+    """Render and store every rendition of the instance image next to it."""
+    instance = model.objects.filter(pk=pk).only("image", "image_renditions").first()
+    if instance is None or not instance.image:
+        return False
+
+    source = instance.image.name
+    storage = instance.image.storage
+    with instance.image.open("rb") as image_file:
+        image = Image.open(image_file)
+        image.load()
+
+    renditions = {"source": source}
+    for rendition in RENDITIONS:
+        renditions[rendition] = storage.save(
+            rendition_name(source, rendition),
+            ContentFile(render(image, rendition)),
+        )
+
+    # Skip the write if the image was replaced while rendering. Renditions of
+    # a replaced image were released when it was replaced.
+    with transaction.atomic():
+        updated = model.objects.filter(pk=pk, image=source).update(
+            image_renditions=renditions
+        )
+        if not updated:
+            release_files(storage, stored_files("", renditions))
+        elif instance.image_renditions.get("source") == source:
+            release_files(storage, stored_files("", instance.image_renditions))
+    return bool(updated)
+
+
+def _generate_in_background(model, pk) -> None:
+    # Nothing waits on the future, so failures are only seen if logged here.
+    try:
+        generate_renditions(model, pk)
+    except Exception:
+        logger.exception(
+            "Generating image renditions failed for %s %s.", model.__name__, pk
+        )
+    finally:
+        connections.close_all()
+
+
+def schedule_renditions(instance) -> None:
+    """Queue rendition generation after commit when the image has changed."""
+    if not instance.image or instance.image_renditions.get("source") == (
+        instance.image.name
+    ):
+        return
+
+    model, pk = type(instance), instance.pk
+    if getattr(settings, "IMAGE_RENDITIONS_EAGER", False):
+        transaction.on_commit(lambda: generate_renditions(model, pk))
+    else:
+        transaction.on_commit(
+            lambda: _executor.submit(_generate_in_background, model, pk)
+        )
@@ -0,0 +1,184 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from social_network.hashtags import filter_posts_by_hashtags
+from social_network.models import Post, Profile, ProfileNameToken
+
+FTS_TABLE = "social_network_post_fts"
+POST_TABLE = Post._meta.db_table
+USER_TABLE = get_user_model()._meta.db_table
+TOKEN_RE = re.compile(r"\w+")
+
+
+def _search_vector():
+    return SearchVector("title", weight="A") + SearchVector("text", weight="B")
+
+
+def _fts_query(text: str) -> str:
+    return " ".join(f'"{term}"' for term in TOKEN_RE.findall(text))
+
+
+def install_search_index(using="default", **kwargs):
+    """Create the vendor specific search index, run after migrations."""
+    db = connections[using]
+    if db.vendor == "postgresql":
+        with db.cursor() as cursor:
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS post_search_vector_idx "
+                f"ON {POST_TABLE} USING gin (search_vector)"
+            )
+            # Trigram indexes serve the UPPER(...) LIKE queries of icontains.
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for column in ("first_name", "last_name"):
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS user_{column}_trgm_idx "
+                    f"ON {USER_TABLE} USING gin (UPPER({column}::text) gin_trgm_ops)"
+                )
+    elif db.vendor == "sqlite":
+        with db.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(title, text)"
+            )
+
+
+def index_post(post: Post) -> None:
+    if connection.vendor == "postgresql":
+        Post.objects.filter(pk=post.pk).update(search_vector=_search_vector())
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, text) VALUES (%s, %s, %s)",
+                [post.pk, post.title, post.text],
+            )
+
+
+def unindex_post(post_id: int) -> None:
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id])
+
+
+def rebuild_search_index() -> int:
+    if connection.vendor == "postgresql":
+        return Post.objects.update(search_vector=_search_vector())
+
+    if connection.vendor == "sqlite":
+        rows = Post.objects.values_list("pk", "title", "text")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, text) VALUES (%s, %s, %s)",
+                list(rows),
+            )
+        return len(rows)
+
+    return 0
+
+
+def search_posts(queryset, text: str):
+    """Filter posts by full-text match and annotate them with `search_rank`."""
+    if connection.vendor == "postgresql":
+        query = SearchQuery(text, search_type="websearch")
+        # ts_rank is a real; as a double its str() survives the cursor
+        # round trip exactly, so pages end instead of repeating boundary rows.
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+        )
+
+    if connection.vendor == "sqlite":
+        match = _fts_query(text)
+        if not match:
+            return queryset.none()
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {POST_TABLE}.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    return queryset.filter(Q(title__icontains=text) | Q(text__icontains=text)).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
+
+
+def filter_posts(queryset, params):
+    """Apply the `?text=` and `?hashtags=` filters of the post lists."""
+    text = params.get("text")
+    hashtags = params.get("hashtags")
+
+    if text:
+        queryset = search_posts(queryset, text)
+    if hashtags:
+        queryset = filter_posts_by_hashtags(queryset, hashtags)
+    return queryset
+
+
+def filter_profiles(queryset, params):
+    """Apply the name and birth date filters of the profile list."""
+    first_name = params.get("first_name")
+    last_name = params.get("last_name")
+    birth_date = params.get("birth_date")
+
+    if first_name:
+        queryset = queryset.filter(user__first_name__icontains=first_name)
+    if last_name:
+        queryset = queryset.filter(user__last_name__icontains=last_name)
+    if birth_date:
+        queryset = queryset.filter(birth_date=birth_date)
+    return queryset
+
+
+def name_tokens(*names) -> list:
+    max_length = ProfileNameToken._meta.get_field("token").max_length
+    tokens = (token[:max_length] for token in TOKEN_RE.findall(" ".join(names).lower()))
+    return list(dict.fromkeys(tokens))
+
+
+def index_profile_name(profile: Profile) -> None:
+    tokens = name_tokens(profile.user.first_name, profile.user.last_name)
+    ProfileNameToken.objects.filter(profile=profile).exclude(token__in=tokens).delete()
+    ProfileNameToken.objects.bulk_create(
+        [ProfileNameToken(profile=profile, token=token) for token in tokens],
+        ignore_conflicts=True,
+    )
+
+
+def rebuild_name_index() -> int:
+    ProfileNameToken.objects.all().delete()
+    profiles = 0
+    for profile in Profile.objects.select_related("user").iterator(chunk_size=1000):
+        index_profile_name(profile)
+        profiles += 1
+    return profiles
+
+
+def autocomplete_profiles(queryset, text: str, limit: int):
+    """Return the most followed profiles with name tokens starting with each term.
+
+    Prefixes are matched as token ranges so a plain B-tree index serves them
+    on every backend.
+    """
+    terms = name_tokens(text)
+    if not terms:
+        return queryset.none()
+
+    for term in terms:
+        queryset = queryset.filter(
+            id__in=ProfileNameToken.objects.filter(
+                token__gte=term, token__lt=term + "\uffff"
+            ).values("profile_id")
+        )
+    return queryset.order_by("-followers_count", "id")[:limit]
@@ -1,20 +1,126 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
 
-from social_network.models import Profile, Comment, Like, Post
+from social_network.fast_lists import full_name
+from social_network.models import Profile, Comment, Like, Post, Hashtag, Upload
+from social_network.reactions import set_reaction
+from social_network.uploads import open_upload, delete_upload
 from user.serializers import UserUpdateProfileSerializer
 
 
-class ProfileSerializer(serializers.ModelSerializer):
-    user = UserUpdateProfileSerializer(many=False, partial=True)
+class ImageRenditionsField(serializers.ReadOnlyField):
+    """Expose stored image renditions as absolute URLs keyed by rendition."""
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        urls = {}
+        for rendition, name in value.items():
+            if rendition == "source":
+                continue
+            url = default_storage.url(name)
+            urls[rendition] = request.build_absolute_uri(url) if request else url
+        return urls
+
+
+def _query_list(request, param: str) -> set:
+    value = request.query_params.get(param, "")
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class SparseFieldsMixin:
+    """Limit read output to `?fields=` and add `Meta.expandable_fields`
+    named in `?expand=`, expandable fields are left out by default."""
+
+    @classmethod
+    def sparse_fields(cls, request) -> set:
+        expandable = set(getattr(cls.Meta, "expandable_fields", ()))
+        names = set(cls.Meta.fields) - expandable
+        if request is None or request.method not in SAFE_METHODS:
+            return names
+
+        requested = _query_list(request, "fields")
+        if requested:
+            names &= requested
+        return names | (_query_list(request, "expand") & expandable)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields
+
+        names = self.sparse_fields(self.context.get("request"))
+        return {name: field for name, field in fields.items() if name in names}
+
+
+class UploadedImageMixin(serializers.Serializer):
+    """Accept a finalized chunked upload in place of a multipart image."""
+
+    upload = serializers.PrimaryKeyRelatedField(
+        queryset=Upload.objects.filter(status=Upload.StatusChoices.COMPLETE),
+        write_only=True,
+        required=False,
+    )
+
+    def validate_upload(self, upload):
+        if upload.user != self.context["request"].user:
+            raise ValidationError("Upload does not belong to you.")
+        return upload
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        self._upload = data.pop("upload", None)
+        if self._upload is not None:
+            data["image"] = open_upload(self._upload)
+        return data
+
+    def save(self, **kwargs):
+        upload = getattr(self, "_upload", None)
+        try:
+            instance = super().save(**kwargs)
+        finally:
+            if upload is not None:
+                self.validated_data["image"].close()
+        # Keep the upload until the image is stored for good, so a failed
+        # save can be retried with the same upload.
+        if upload is not None:
+            transaction.on_commit(lambda: delete_upload(upload))
+        return instance
+
+
+class InlineFollowsMixin(serializers.Serializer):
     following = serializers.SerializerMethodField()
     followers = serializers.SerializerMethodField()
 
+    inline_follows_limit = 10
+
+    def _inline_names(self, obj, name):
+        # Async views load the names beforehand, serializing cannot query there.
+        inline_follows = self.context.get("inline_follows")
+        if inline_follows is not None:
+            return inline_follows[name]
+        profiles = getattr(obj, name).select_related("user").order_by("id")
+        return [profile.full_name for profile in profiles[: self.inline_follows_limit]]
+
     def get_following(self, obj):
-        return [following.full_name for following in obj.following.all()]
+        return self._inline_names(obj, "following")
 
     def get_followers(self, obj):
-        return [follower.full_name for follower in obj.followers.all()]
+        return self._inline_names(obj, "followers")
+
+
+class ProfileSerializer(
+    SparseFieldsMixin, InlineFollowsMixin, serializers.ModelSerializer
+):
+    image_renditions = ImageRenditionsField()
+    user = UserUpdateProfileSerializer(many=False, partial=True)
 
     class Meta:
         model = Profile
@@ -22,14 +128,23 @@ class ProfileSerializer(serializers.ModelSerializer):
             "id",
             "user",
             "image",
+            "image_renditions",
             "birth_date",
             "gender",
             "bio",
             "phone_number",
             "following",
             "followers",
+            "following_count",
+            "followers_count",
         ]
-        read_only_fields = ("id", "user", "following")
+        read_only_fields = (
+            "id",
+            "user",
+            "following",
+            "following_count",
+            "followers_count",
+        )
 
     def validate(self, attrs):
         data = super(ProfileSerializer, self).validate(attrs=attrs)
@@ -60,9 +175,12 @@ class ProfileSerializer(serializers.ModelSerializer):
         return instance
 
 
-class ProfileListSerializer(serializers.ModelSerializer):
-    following_count = serializers.IntegerField(source="following.count")
-    followers_count = serializers.IntegerField(source="followers.count")
+class ProfileListSerializer(
+    SparseFieldsMixin, InlineFollowsMixin, serializers.ModelSerializer
+):
+    values_fields = {
+        "full_name": (("user__first_name", "user__last_name"), full_name),
+    }
 
     class Meta:
         model = Profile
@@ -75,16 +193,28 @@ class ProfileListSerializer(serializers.ModelSerializer):
             "phone_number",
             "following_count",
             "followers_count",
+            "following",
+            "followers",
         )
+        expandable_fields = ("following", "followers")
+
 
+class ProfileImageSerializer(UploadedImageMixin, serializers.ModelSerializer):
+    image_renditions = ImageRenditionsField()
 
-class ProfileImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
-        fields = ("id", "image")
+        fields = ("id", "image", "image_renditions", "upload")
+        extra_kwargs = {"image": {"required": False}}
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if not data.get("image"):
+            raise ValidationError({"image": "No file was submitted."})
+        return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.CharField(read_only=True, source="user.full_name")
     post = serializers.CharField(read_only=True, source="post.title")
 
@@ -107,7 +237,8 @@ class CommentDetailForPostSerializer(CommentSerializer):
         fields = ("user", "text", "created")
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    image_renditions = ImageRenditionsField()
     user = serializers.CharField(read_only=True, source="user.full_name")
     comments = CommentDetailForPostSerializer(many=True, read_only=True)
     likes_count = serializers.IntegerField(read_only=True)
@@ -119,6 +250,7 @@ class PostSerializer(serializers.ModelSerializer):
             "id",
             "title",
             "image",
+            "image_renditions",
             "text",
             "hashtags",
             "user",
@@ -130,19 +262,22 @@ class PostSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "comments")
 
 
-class PostCreateSerializer(PostSerializer):
+class PostCreateSerializer(UploadedImageMixin, PostSerializer):
     class Meta:
         model = Post
         fields = (
             "id",
             "title",
             "image",
+            "image_renditions",
             "text",
             "hashtags",
+            "upload",
         )
 
 
 class PostRetrieveSerializer(PostSerializer):
+    image_renditions = ImageRenditionsField()
     user = serializers.CharField(read_only=True, source="user.full_name")
     comments = CommentDetailForPostSerializer(many=True, read_only=True)
     likes_count = serializers.IntegerField(read_only=True)
@@ -154,6 +289,7 @@ class PostRetrieveSerializer(PostSerializer):
             "id",
             "title",
             "image",
+            "image_renditions",
             "text",
             "hashtags",
             "user",
@@ -175,17 +311,24 @@ class PostRetrieveSerializer(PostSerializer):
     )
 
 
-class PostListSerializer(serializers.ModelSerializer):
+class PostListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    image_renditions = ImageRenditionsField()
     user = serializers.CharField(read_only=True, source="user.full_name")
+    comments = CommentDetailForPostSerializer(many=True, read_only=True)
     likes_count = serializers.IntegerField()
     dislikes_count = serializers.IntegerField()
 
+    values_fields = {
+        "user": (("user__first_name", "user__last_name"), full_name),
+    }
+
     class Meta:
         model = Post
         fields = (
             "id",
             "title",
             "image",
+            "image_renditions",
             "text",
             "hashtags",
             "user",
@@ -193,7 +336,9 @@ class PostListSerializer(serializers.ModelSerializer):
             "comments_count",
             "likes_count",
             "dislikes_count",
+            "comments",
         )
+        expandable_fields = ("comments",)
 
 
 class LikeSerializer(serializers.ModelSerializer):
@@ -210,31 +355,55 @@ class LikeCreateSerializer(LikeSerializer):
         model = Like
         fields = ("action",)
 
-    def validate(self, attrs):
-        data = super(LikeCreateSerializer, self).validate(attrs)
+    def save(self, *args, **kwargs):
         post = self.context["post"]
-        action = attrs["action"]
+        action = self.validated_data["action"]
         user = self.context["request"].user
 
-        if Like.objects.filter(
-            post=post,
-            user=user,
-            action=action,
-        ).exists():
-            raise serializers.ValidationError(f"You have already {action} this post.")
+        like_id = set_reaction(user.pk, post.pk, action, author_id=post.user_id)
+        if like_id is None:
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        f"You have already {action} this post."
+                    ]
+                }
+            )
 
-        return data
+        self.instance = Like(id=like_id, user=user, post=post, action=action)
+        return self.instance
 
-    def save(self, *args, **kwargs):
-        post = self.context["post"]
-        action = self.validated_data["action"]
-        user = self.context["request"].user
 
-        like, created = Like.objects.get_or_create(
-            user=user, post=post, defaults={"action": action}
-        )
-        if not created:
-            like.action = action
-            like.save()
+class UploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Upload
+        fields = ("id", "filename", "size", "offset", "status", "created")
+        read_only_fields = ("id", "offset", "status", "created")
+
+    def validate_size(self, size):
+        if size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise ValidationError(
+                f"Ensure this value is less than or equal to "
+                f"{settings.CHUNKED_UPLOAD_MAX_SIZE}."
+            )
+        return size
+
+
+class LikeBulkItemSerializer(serializers.Serializer):
+    post_id = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=Like.ActionChoices.choices)
+
+
+class LikeBulkResultSerializer(LikeBulkItemSerializer):
+    status = serializers.CharField(read_only=True)
+
+
+class HashtagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Hashtag
+        fields = ("id", "name")
+
 
-        return like
+class TrendingHashtagSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    count = serializers.IntegerField()
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from social_network.follows import follows_added, follows_removed
+from social_network.hashtags import sync_post_hashtags
+from social_network.live import publish_comment, publish_post
+from social_network.metrics import record_query
+from social_network.models import Comment, Post, Profile
+from social_network.renditions import (
+    release_files,
+    schedule_renditions,
+    stored_files,
+)
+from social_network.search import index_post, unindex_post, index_profile_name
+from social_network.trending import record_hashtags
+from social_network.timeline import fan_out_post
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    connection.execute_wrappers.append(record_query)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        fan_out_post(instance)
+        publish_post(instance)
+    index_post(instance)
+    hashtag_ids = sync_post_hashtags(instance)
+    if created:
+        record_hashtags(hashtag_ids)
+    schedule_renditions(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Profile)
+def image_replaced(sender, instance, update_fields, **kwargs):
+    if instance.pk is None or (
+        update_fields is not None and "image" not in update_fields
+    ):
+        return
+
+    previous = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("image", "image_renditions")
+        .first()
+    )
+    if previous is not None and previous[0] != instance.image.name:
+        release_files(instance.image.storage, stored_files(*previous))
+        instance.image_renditions = {}
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Profile)
+def image_owner_deleted(sender, instance, **kwargs):
+    release_files(
+        instance.image.storage,
+        stored_files(instance.image.name, instance.image_renditions),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_comment(instance)
+
+
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, **kwargs):
+    index_profile_name(instance)
+    schedule_renditions(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    if created or (
+        update_fields is not None
+        and not {"first_name", "last_name"}.intersection(update_fields)
+    ):
+        return
+
+    profile = Profile.objects.filter(user=instance).first()
+    if profile is not None:
+        profile.user = instance
+        index_profile_name(profile)
+
+
+@receiver(m2m_changed, sender=Profile.following.through)
+def following_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        related = instance.followers if reverse else instance.following
+        pk_set = set(related.values_list("pk", flat=True))
+    elif action not in ("post_add", "post_remove"):
+        return
+
+    profiles = Profile.objects.only("pk", "user_id").in_bulk(pk_set)
+    pairs = [
+        (profile, instance) if reverse else (instance, profile)
+        for profile in profiles.values()
+    ]
+    if action == "post_add":
+        follows_added(pairs)
+    else:
+        follows_removed(pairs)
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from social_network.models import MediaBlob
+
+
+def _add_reference(name: str, size: int) -> None:
+    if MediaBlob.objects.filter(name=name).update(refcount=F("refcount") + 1):
+        return
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(name=name, size=size, refcount=1)
+    except IntegrityError:
+        MediaBlob.objects.filter(name=name).update(refcount=F("refcount") + 1)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage that keeps one blob per SHA-256 of the content.
+
+    Saving content that is already stored adds a reference to the existing
+    blob instead of writing a copy, and delete() drops a reference. Blobs
+    nothing refers to are removed by collect_garbage().
+    """
+
+    prefix = "blobs"
+
+    def blob_name(self, digest: str, extension: str) -> str:
+        return "/".join((self.prefix, digest[:2], digest[2:4], digest + extension))
+
+    def is_blob(self, name: str) -> bool:
+        return name.startswith(self.prefix + "/")
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        extension = re.sub(r"[^a-z0-9.]", "", os.path.splitext(name)[1].lower())
+        directory = self.path(self.prefix)
+        os.makedirs(directory, exist_ok=True)
+
+        digest, size = hashlib.sha256(), 0
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+
+            name = self.blob_name(digest.hexdigest(), extension)
+            path = self.path(name)
+            with transaction.atomic():
+                # Referencing first blocks a concurrent collection of the blob.
+                _add_reference(name, size)
+                if os.path.exists(path):
+                    # A fresh mtime keeps the orphan sweep of collect_garbage
+                    # off a file this uncommitted reference is reviving.
+                    os.utime(path)
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(temp_path, self.file_permissions_mode)
+                    os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return name
+
+    def delete(self, name):
+        if not self.is_blob(name):
+            return super().delete(name)
+        MediaBlob.objects.filter(name=name, refcount__gt=0).update(
+            refcount=F("refcount") - 1, released=timezone.now()
+        )
+
+    def collect_garbage(self, grace_period: timedelta) -> int:
+        """Remove blobs left without references for longer than grace_period.
+
+        Files under the blob prefix without a `MediaBlob` row, left by saves
+        whose transaction rolled back or by interrupted writes, are removed
+        once they are older than grace_period too.
+        """
+        collected = self._collect_orphans(grace_period)
+        candidates = MediaBlob.objects.filter(
+            refcount=0, released__lt=timezone.now() - grace_period
+        ).values_list("pk", "name")
+        for pk, name in candidates.iterator():
+            with transaction.atomic():
+                deleted, _ = MediaBlob.objects.filter(pk=pk, refcount=0).delete()
+                if deleted:
+                    super().delete(name)
+                    collected += 1
+        return collected
+
+    def _collect_orphans(self, grace_period: timedelta) -> int:
+        cutoff = time.time() - grace_period.total_seconds()
+        root = self.path(self.prefix)
+        collected = 0
+        for directory, _, filenames in os.walk(root):
+            stale = {}
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    if os.path.getmtime(path) >= cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+                relative = os.path.relpath(path, root).replace(os.sep, "/")
+                stale["/".join((self.prefix, relative))] = path
+
+            referenced = set(
+                MediaBlob.objects.filter(name__in=stale).values_list("name", flat=True)
+            )
+            for name, path in stale.items():
+                if name not in referenced:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        continue
+                    collected += 1
+        return collected
@@ -0,0 +1,37 @@
+from itertools import islice
+
+from django.db import transaction
+
+from social_network.graph import FollowGraph, compute_suggestions
+from social_network.models import Profile, ProfileSuggestion
+
+BATCH_SIZE = 1000
+
+
+def load_follow_graph() -> FollowGraph:
+    ids = Profile.objects.order_by("id").values_list("id", flat=True)
+    edges = (
+        Profile.following.through.objects.order_by("from_profile_id", "to_profile_id")
+        .values_list("from_profile_id", "to_profile_id")
+        .iterator(chunk_size=10000)
+    )
+    return FollowGraph.from_edges(ids, edges)
+
+
+def rebuild_suggestions(top_k: int, workers: int) -> int:
+    """Recompute friends-of-friends suggestions for all profiles."""
+    rows = compute_suggestions(load_follow_graph(), top_k, workers)
+    stored = 0
+
+    with transaction.atomic():
+        ProfileSuggestion.objects.all().delete()
+        while batch := list(islice(rows, BATCH_SIZE)):
+            ProfileSuggestion.objects.bulk_create(
+                ProfileSuggestion(
+                    profile_id=profile_id, suggested_id=suggested, score=score
+                )
+                for profile_id, suggested, score in batch
+            )
+            stored += len(batch)
+
+    return stored
@@ -0,0 +1,124 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+
+from social_network.models import Comment, Post, Profile
+
+
+class AsyncReadApiTests(TestCase):
+    def setUp(self):
+        self.user1 = get_user_model().objects.create_user(
+            email="test1@test1.com",
+            password="TestUser1",
+            first_name="test1 FN",
+            last_name="test1 LN",
+        )
+        self.user2 = get_user_model().objects.create_user(
+            email="test2@test2.com",
+            password="TestUser2",
+            first_name="test2 FN",
+            last_name="test2 LN",
+        )
+        self.profile1 = Profile.objects.create(
+            user=self.user1, gender="Male", birth_date="2001-01-01"
+        )
+        self.profile2 = Profile.objects.create(
+            user=self.user2, gender="Female", birth_date="2002-02-02"
+        )
+        self.profile1.following.add(self.profile2)
+        self.post = Post.objects.create(user=self.user2, title="Test", text="text")
+        Comment.objects.create(post=self.post, user=self.user1, text="comment")
+        Post.objects.create(user=self.user1, title="Own", text="text")
+        self.headers = {
+            "Authorization": f"Token {Token.objects.create(user=self.user1).key}"
+        }
+
+    def assert_matches_sync(self, sync_name, async_name, *args, **params):
+        sync_res = self.client.get(
+            reverse(f"social_network:{sync_name}", args=args),
+            params,
+            headers=self.headers,
+        )
+        async_res = self.client.get(
+            reverse(f"social_network:{async_name}", args=args),
+            params,
+            headers=self.headers,
+        )
+
+        self.assertEqual(async_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            json.loads(async_res.content.replace(b"/async", b"")), sync_res.json()
+        )
+        return async_res
+
+    def test_auth_required(self):
+        res = self.client.get(reverse("social_network:async-post-list"))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res["WWW-Authenticate"], "Token")
+
+    def test_invalid_token(self):
+        res = self.client.get(
+            reverse("social_network:async-post-list"),
+            headers={"Authorization": "Token invalid"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_feed_matches_sync(self):
+        res = self.assert_matches_sync(
+            "post-list", "async-post-list", page_size=1, fields="id,title,user"
+        )
+
+        self.assertIsNotNone(res.json()["next"])
+
+    def test_filtered_feed_matches_sync(self):
+        res = self.assert_matches_sync("post-list", "async-post-list", text="own")
+
+        self.assertEqual([post["title"] for post in res.json()["results"]], ["Own"])
+
+    def test_post_detail_matches_sync(self):
+        res = self.assert_matches_sync("post-detail", "async-post-detail", self.post.id)
+
+        not_modified = self.client.get(
+            reverse("social_network:async-post-detail", args=[self.post.id]),
+            headers={**self.headers, "If-None-Match": res["ETag"]},
+        )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_post_detail_not_found(self):
+        res = self.client.get(
+            reverse("social_network:async-post-detail", args=[0]),
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_profile_list_matches_sync(self):
+        self.assert_matches_sync("profile-list", "async-profile-list")
+
+    def test_filtered_profile_list_matches_sync(self):
+        res = self.assert_matches_sync(
+            "profile-list", "async-profile-list", first_name="test2"
+        )
+
+        self.assertEqual(
+            [profile["id"] for profile in res.json()["results"]], [self.profile2.id]
+        )
+
+    def test_profile_detail_matches_sync(self):
+        self.assert_matches_sync(
+            "profile-detail", "async-profile-detail", self.profile2.id
+        )
+
+    async def test_async_client(self):
+        res = await self.async_client.get(
+            reverse("social_network:async-profile-list"), headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()["results"]), 2)
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from social_network.models import Post, Hashtag, HashtagCounter
+from social_network.trending import record_hashtags, truncate, HOUR
+
+TRENDING_URL = reverse("social_network:hashtag-trending")
+
+
+class TrendingHashtagApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test1@test1.com",
+            password="TestUser1",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_auth_required(self):
+        self.client.force_authenticate(None)
+        res = self.client.get(TRENDING_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_trending_counts_new_posts(self):
+        for hashtags in ("#art #music", "#art", "#travel #art", "#music"):
+            Post.objects.create(user=self.user, title="Test", hashtags=hashtags)
+
+        res = self.client.get(TRENDING_URL, {"limit": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        expected = [{"name": "art", "count": 3}, {"name": "music", "count": 2}]
+        self.assertEqual(res.data["hour"], expected)
+        self.assertEqual(res.data["day"], expected)
+
+    def test_trending_hour_excludes_older_posts(self):
+        art, music = (Hashtag.objects.create(name=name) for name in ("art", "music"))
+        record_hashtags([art.id], moment=timezone.now() - timedelta(hours=3))
+        record_hashtags([music.id])
+
+        res = self.client.get(TRENDING_URL)
+
+        self.assertEqual(res.data["hour"], [{"name": "music", "count": 1}])
+        self.assertEqual(
+            res.data["day"],
+            [{"name": "art", "count": 1}, {"name": "music", "count": 1}],
+        )
+
+    def test_rollup_command_folds_minutes_into_hours(self):
+        art = Hashtag.objects.create(name="art")
+        hour = truncate(timezone.now() - timedelta(hours=3), HOUR)
+        for minutes in (0, 1, 2):
+            record_hashtags([art.id], moment=hour + timedelta(minutes=minutes))
+        record_hashtags([art.id], moment=timezone.now() - timedelta(days=8))
+
+        call_command("rollup_hashtag_counters", stdout=StringIO())
+
+        self.assertEqual(
+            list(HashtagCounter.objects.values_list("granularity", "bucket", "count")),
+            [(HOUR, hour, 3)],
+        )
+        res = self.client.get(TRENDING_URL)
+        self.assertEqual(res.data["day"], [{"name": "art", "count": 3}])
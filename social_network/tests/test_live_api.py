@@ -0,0 +1,100 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+
+from social_network.live import LiveHub, hub
+from social_network.models import Post, Profile
+
+LIVE_FEED_URL = reverse("social_network:async-live-feed")
+
+
+class LiveHubTests(TestCase):
+    async def test_subscription_receives_followed_authors_only(self):
+        live_hub = LiveHub(buffer_size=10, max_pending=10)
+        subscription, replay, reset = live_hub.subscribe(1, {2})
+
+        live_hub.publish("post", 2, {"id": 1})
+        live_hub.publish("post", 3, {"id": 2})
+        await asyncio.sleep(0)
+
+        self.assertEqual((replay, reset), ([], False))
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertEqual(subscription.queue.get_nowait().data, {"id": 1})
+
+    async def test_follow_changes_update_subscription(self):
+        live_hub = LiveHub(buffer_size=10, max_pending=10)
+        subscription, _, _ = live_hub.subscribe(1, set())
+
+        live_hub.follow_changed(1, 3, added=True)
+        await asyncio.sleep(0)
+        live_hub.publish("post", 3, {"id": 1})
+        await asyncio.sleep(0)
+
+        self.assertEqual(subscription.queue.qsize(), 1)
+
+    async def test_resume_from_last_event_id(self):
+        live_hub = LiveHub(buffer_size=3, max_pending=10)
+        for index in range(5):
+            live_hub.publish("post", 2, {"id": index})
+
+        _, replay, reset = live_hub.subscribe(1, {2}, f"{live_hub.boot}-3")
+        self.assertFalse(reset)
+        self.assertEqual([event.data["id"] for event in replay], [3, 4])
+
+        _, replay, reset = live_hub.subscribe(1, {2}, f"{live_hub.boot}-1")
+        self.assertTrue(reset)
+
+        _, replay, reset = live_hub.subscribe(1, {2}, "other-3")
+        self.assertTrue(reset)
+
+
+class LiveFeedApiTests(TestCase):
+    def setUp(self):
+        self.user1 = get_user_model().objects.create_user(
+            email="test1@test1.com", password="TestUser1"
+        )
+        self.user2 = get_user_model().objects.create_user(
+            email="test2@test2.com", password="TestUser2"
+        )
+        self.profile1 = Profile.objects.create(user=self.user1, gender="Male")
+        self.profile2 = Profile.objects.create(user=self.user2, gender="Female")
+        self.profile1.following.add(self.profile2)
+        self.headers = {
+            "Authorization": f"Token {Token.objects.create(user=self.user1).key}"
+        }
+
+    def test_auth_required(self):
+        res = self.client.get(LIVE_FEED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_new_post_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(user=self.user2, title="Live", text="text")
+
+        event = hub._buffer[-1]
+        self.assertEqual((event.kind, event.author_id), ("post", self.user2.pk))
+        self.assertEqual(event.data["id"], post.id)
+
+    def test_stream_requires_asgi(self):
+        res = self.client.get(LIVE_FEED_URL, headers=self.headers)
+        self.assertEqual(res.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+    async def test_stream_events(self):
+        res = await self.async_client.get(LIVE_FEED_URL, headers=self.headers)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+
+        stream = aiter(res.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+
+        hub.publish("comment", self.user2.pk, {"id": 1})
+        chunk = await asyncio.wait_for(anext(stream), 1)
+
+        self.assertIn(b"event: comment", chunk)
+        self.assertIn(b'data: {"id": 1}', chunk)
+        await stream.aclose()
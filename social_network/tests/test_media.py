@@ -0,0 +1,193 @@
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from social_network.models import MediaBlob, Post, Profile
+
+POST_URL = reverse("social_network:post-list")
+
+
+def sample_image(color="red") -> SimpleUploadedFile:
+    buffer = BytesIO()
+    Image.new("RGB", (10, 10), color).save(buffer, format="JPEG")
+    return SimpleUploadedFile("image.jpg", buffer.getvalue(), "image/jpeg")
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root.name)
+        self.settings_override.enable()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="TestUser1"
+        )
+        self.profile = Profile.objects.create(
+            user=self.user, gender="Male", birth_date="2001-01-01"
+        )
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media_root.cleanup()
+
+    def create_post(self, image):
+        res = self.client.post(
+            POST_URL,
+            {"title": "Test", "text": "text", "image": image},
+            format="multipart",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED, res.data)
+        return Post.objects.get(id=res.data["id"])
+
+    def test_identical_uploads_share_blob(self):
+        post1 = self.create_post(sample_image())
+        post2 = self.create_post(sample_image())
+        post3 = self.create_post(sample_image("blue"))
+
+        self.assertEqual(post1.image.name, post2.image.name)
+        self.assertNotEqual(post1.image.name, post3.image.name)
+        self.assertTrue(post1.image.name.startswith("blobs/"))
+        self.assertEqual(MediaBlob.objects.get(name=post1.image.name).refcount, 2)
+
+    def test_unreferenced_blobs_collected(self):
+        post1 = self.create_post(sample_image())
+        post2 = self.create_post(sample_image())
+        path = post1.image.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post1.delete()
+        call_command("gc_media_blobs", "--grace-period", "0", stdout=StringIO())
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post2.delete()
+        call_command("gc_media_blobs", "--grace-period", "0", stdout=StringIO())
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_orphaned_files_collected_after_grace_period(self):
+        post = self.create_post(sample_image())
+        orphans = []
+        for name in ("blobs/ab/cd/abcd.jpg", "blobs/tmp1234.part"):
+            orphans.append(default_storage.path(name))
+            os.makedirs(os.path.dirname(orphans[-1]), exist_ok=True)
+            with open(orphans[-1], "wb") as orphan:
+                orphan.write(b"data")
+
+        self.assertEqual(default_storage.collect_garbage(timedelta(hours=1)), 0)
+
+        hour_ago = time.time() - 3600
+        for path in (*orphans, post.image.path):
+            os.utime(path, (hour_ago, hour_ago))
+        self.assertEqual(default_storage.collect_garbage(timedelta(minutes=1)), 2)
+        self.assertFalse(any(os.path.exists(path) for path in orphans))
+        self.assertTrue(os.path.exists(post.image.path))
+
+    @override_settings(IMAGE_RENDITIONS_EAGER=True)
+    def test_replaced_image_released(self):
+        url = reverse("social_network:profile-upload-image", args=[self.profile.id])
+        self.client.post(url, {"image": sample_image()}, format="multipart")
+        self.profile.refresh_from_db()
+        old_name = self.profile.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"image": sample_image("blue")}, format="multipart")
+
+        self.assertEqual(MediaBlob.objects.get(name=old_name).refcount, 0)
+        self.assertEqual(default_storage.collect_garbage(timedelta(0)), 1)
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root.name, MEDIA_SENDFILE=None
+        )
+        self.settings_override.enable()
+        self.content = bytes(range(256)) * 4
+        with open(os.path.join(self.media_root.name, "file.bin"), "wb") as media_file:
+            media_file.write(self.content)
+        self.url = reverse("media", kwargs={"path": "file.bin"})
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media_root.cleanup()
+
+    def test_serve_file(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(res.streaming_content), self.content)
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertIn("ETag", res)
+
+    def test_missing_file(self):
+        res = self.client.get(reverse("media", kwargs={"path": "missing.bin"}))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_conditional_get(self):
+        res = self.client.get(self.url)
+
+        etag_res = self.client.get(self.url, HTTP_IF_NONE_MATCH=res["ETag"])
+        date_res = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=res["Last-Modified"]
+        )
+
+        self.assertEqual(etag_res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(date_res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_byte_ranges(self):
+        res = self.client.get(self.url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(res.streaming_content), self.content[10:20])
+        self.assertEqual(res["Content-Range"], f"bytes 10-19/{len(self.content)}")
+
+        res = self.client.get(self.url, HTTP_RANGE="bytes=-5")
+        self.assertEqual(b"".join(res.streaming_content), self.content[-5:])
+
+        res = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.content)}-")
+        self.assertEqual(
+            res.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+    def test_stale_if_range_serves_full_file(self):
+        res = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(MEDIA_SENDFILE="x-accel-redirect")
+    def test_accel_redirect_offload(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(res["X-Accel-Redirect"], "/protected-media/file.bin")
+        self.assertEqual(res.content, b"")
+
+    @override_settings(MEDIA_SENDFILE="x-sendfile")
+    def test_sendfile_offload(self):
+        res = self.client.get(self.url)
+
+        self.assertEqual(
+            res["X-Sendfile"], os.path.join(self.media_root.name, "file.bin")
+        )
+
+    def test_blob_served_immutable(self):
+        name = default_storage.save("image.jpg", sample_image())
+
+        res = self.client.get(reverse("media", kwargs={"path": name}))
+
+        self.assertIn("immutable", res["Cache-Control"])
+        self.assertIn(os.path.basename(name).split(".")[0], res["ETag"])
@@ -0,0 +1,98 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from social_network.metrics import (
+    BYTES,
+    COUNT,
+    QUERIES,
+    MetricsRegistry,
+    registry,
+)
+from social_network.models import Post
+
+
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test1@test1.com", password="TestUser1"
+        )
+        Post.objects.create(user=self.user, title="Test", text="text")
+        self.client = APIClient()
+
+    def observed(self, route):
+        return registry.collect().get((route, "GET", "200"), [0] * (BYTES + 1))
+
+    def assert_recorded(self, route, url, **kwargs):
+        before = self.observed(route)
+        res = self.client.get(url, **kwargs)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        after = self.observed(route)
+
+        self.assertEqual(after[COUNT], before[COUNT] + 1)
+        self.assertGreater(after[QUERIES], before[QUERIES])
+        self.assertEqual(after[BYTES], before[BYTES] + len(res.content))
+
+    def test_records_per_route(self):
+        self.client.force_authenticate(self.user)
+        self.assert_recorded(
+            "social-network:post-list", reverse("social_network:post-list")
+        )
+
+    def test_records_queries_of_async_views(self):
+        token = Token.objects.create(user=self.user)
+        self.assert_recorded(
+            "social-network:async-post-list",
+            reverse("social_network:async-post-list"),
+            headers={"Authorization": f"Token {token.key}"},
+        )
+
+    def test_unknown_methods_share_one_label(self):
+        url = reverse("metrics")
+        for method in ("FOO", "BAR"):
+            self.client.generic(method, url)
+
+        methods = {labels[1] for labels in registry.collect() if labels[0] == "metrics"}
+        self.assertIn("other", methods)
+        self.assertFalse(methods & {"FOO", "BAR"})
+
+    def test_metrics_endpoint(self):
+        self.client.force_authenticate(self.user)
+        self.client.get(reverse("social_network:post-list"))
+
+        res = self.client.get(reverse("metrics"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain; version=0.0.4"))
+        labels = 'route="social-network:post-list",method="GET",status="200"'
+        content = res.content.decode()
+        self.assertIn(
+            f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}', content
+        )
+        self.assertIn(f"http_request_db_queries_total{{{labels}}}", content)
+        self.assertIn(f"http_response_bytes_total{{{labels}}}", content)
+
+
+class MetricsRegistryTests(TestCase):
+    def test_aggregates_processes_sharing_a_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(
+                METRICS_DIR=directory, METRICS_LATENCY_BUCKETS=(0.1, 1)
+            ):
+                first, second = MetricsRegistry(), MetricsRegistry()
+            labels = ("social-network:post-list", "GET", "200")
+            first.observe(labels, 0.05, 3, 0.01, 100)
+            first.observe(labels, 0.5, 1, 0.01, 100)
+            second.observe(labels, 2, 2, 0.01, 50)
+            first.flush()
+
+            total = second.collect()[labels]
+
+        self.assertEqual(total[COUNT], 3)
+        self.assertEqual(total[QUERIES], 6)
+        self.assertEqual(total[BYTES], 250)
+        self.assertEqual(total[-3:], [1, 1, 1])
@@ -1,15 +1,18 @@
 import os
 import tempfile
+from io import StringIO
 
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
-from social_network.models import Post, Profile, Comment, Like
+from social_network.models import Post, Profile, Comment, Like, TimelineEntry
 from social_network.serializers import (
     PostRetrieveSerializer,
     PostListSerializer,
@@ -25,14 +28,7 @@ def sample_post(user, **params) -> Post:
 
 
 def posts_queryset(**filters):
-    return (
-        Post.objects.filter(**filters)
-        .order_by("-created")
-        .annotate(
-            likes_count=Count("likes", filter=Q(likes__action="like")),
-            dislikes_count=Count("likes", filter=Q(likes__action="dislike")),
-        )
-    )
+    return Post.objects.filter(**filters).order_by("-created", "-id")
 
 
 def profile_follow_or_unfollow_url(profile_id):
@@ -117,7 +113,102 @@ class AuthenticatedProfileApiTests(TestCase):
         serializer = PostListSerializer(queryset, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_posts_sparse_fields(self):
+        post = sample_post(self.user1)
+        Comment.objects.create(post=post, user=self.user1, text="comment")
+
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(POST_URL, {"expand": "comments"})
+        with CaptureQueriesContext(connection) as sparse:
+            res = self.client.get(POST_URL, {"fields": "id,title"})
+
+        self.assertEqual(res.data["results"], [{"id": post.id, "title": "Test"}])
+        self.assertLess(len(sparse), len(full))
+        user_table = get_user_model()._meta.db_table
+        self.assertNotIn(user_table, sparse.captured_queries[-1]["sql"])
+
+    def test_list_posts_expand_comments(self):
+        post = sample_post(self.user1)
+        Comment.objects.create(post=post, user=self.user1, text="comment")
+
+        res = self.client.get(POST_URL)
+        self.assertNotIn("comments", res.data["results"][0])
+
+        res = self.client.get(POST_URL, {"fields": "id", "expand": "comments"})
+        self.assertEqual(res.data["results"][0]["comments"][0]["text"], "comment")
+        self.assertEqual(set(res.data["results"][0]), {"id", "comments"})
+
+    def test_list_posts_fast_path_matches_serializer(self):
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
+            Image.new("RGB", (10, 10)).save(ntf, format="JPEG")
+            ntf.seek(0)
+            self.client.post(
+                POST_URL,
+                {"title": "Image", "text": "text", "image": ntf},
+                format="multipart",
+            )
+        sample_post(self.user1, hashtags="#tag")
+
+        fast = self.client.get(POST_URL)
+        with override_settings(FAST_LIST_RENDERING=False):
+            slow = self.client.get(POST_URL)
+
+        self.assertEqual(fast.content, slow.content)
+
+    def test_list_posts_after_follow_includes_older_posts(self):
+        post = sample_post(self.user2)
+
+        self.client.get(profile_follow_or_unfollow_url(self.profile2.id))
+        res = self.client.get(POST_URL)
+
+        self.assertEqual([item["id"] for item in res.data["results"]], [post.id])
+
+    def test_list_posts_after_unfollow_excludes_posts(self):
+        url = profile_follow_or_unfollow_url(self.profile2.id)
+        self.client.get(url)
+        sample_post(self.user2)
+        own_post = sample_post(self.user1)
+
+        self.client.get(url)
+        res = self.client.get(POST_URL)
+
+        self.assertEqual([item["id"] for item in res.data["results"]], [own_post.id])
+
+    def test_rebuild_timelines_command(self):
+        self.profile1.following.add(self.profile2)
+        posts = [sample_post(user) for user in (self.user1, self.user2, self.user3)]
+        TimelineEntry.objects.all().delete()
+
+        call_command("rebuild_timelines", stdout=StringIO())
+
+        self.assertEqual(
+            set(
+                TimelineEntry.objects.filter(user=self.user1).values_list(
+                    "post_id", flat=True
+                )
+            ),
+            {posts[0].id, posts[1].id},
+        )
+
+    def test_list_posts_cursor_pagination(self):
+        posts = [sample_post(self.user1) for _ in range(5)]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(POST_URL, {"page_size": 2})
+            ids = [item["id"] for item in res.data["results"]]
+            while res.data["next"]:
+                res = self.client.get(res.data["next"])
+                ids.extend(item["id"] for item in res.data["results"])
+
+        self.assertEqual(ids, [post.id for post in reversed(posts)])
+        # Pages are ordered and cut on the timeline entry index columns.
+        timeline_created = f'"{TimelineEntry._meta.db_table}"."created" <'
+        page_queries = [
+            query["sql"] for query in queries if timeline_created in query["sql"]
+        ]
+        self.assertEqual(len(page_queries), 2)
 
     def test_filter_post_by_text(self):
         text_to_find = "post"
@@ -129,7 +220,45 @@ class AuthenticatedProfileApiTests(TestCase):
         queryset = posts_queryset(id__in=(post2.id, post3.id))
         serializer = PostListSerializer(queryset, many=True)
 
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data["results"])
+
+    def test_filter_post_by_text_ranks_title_matches_first(self):
+        text_match = sample_post(self.user1, title="Weekend", text="hiking trip")
+        title_match = sample_post(self.user1, title="Hiking", text="weekend")
+        sample_post(self.user1, title="Climb", text="mountains")
+
+        res = self.client.get(POST_URL, {"text": "hiking"})
+
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]],
+            [title_match.id, text_match.id],
+        )
+
+    def test_filter_post_by_text_paginates_to_the_end(self):
+        posts = [
+            sample_post(self.user1, title="Hiking" if i % 2 else "Trip", text="hiking")
+            for i in range(12)
+        ]
+        sample_post(self.user1, title="Climb", text="mountains")
+
+        res = self.client.get(POST_URL, {"text": "hiking", "page_size": 4})
+        ids, pages = [item["id"] for item in res.data["results"]], 1
+        while res.data["next"] and pages < 10:
+            res = self.client.get(res.data["next"])
+            ids.extend(item["id"] for item in res.data["results"])
+            pages += 1
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(sorted(ids), [post.id for post in posts])
+
+    def test_rebuild_search_index_command(self):
+        post = sample_post(self.user1, title="Draft")
+        Post.objects.filter(id=post.id).update(title="Indexed title")
+
+        call_command("rebuild_search_index", stdout=StringIO())
+        res = self.client.get(POST_URL, {"text": "indexed"})
+
+        self.assertEqual([item["id"] for item in res.data["results"]], [post.id])
 
     def test_filter_post_by_hashtags(self):
         hashtag_to_find = "post"
@@ -140,7 +269,36 @@ class AuthenticatedProfileApiTests(TestCase):
         queryset = posts_queryset(id=post2.id)
         serializer = PostListSerializer(queryset, many=True)
 
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data["results"])
+
+    def test_filter_post_by_hashtags_is_exact(self):
+        art = sample_post(self.user1, hashtags="#art #Music")
+        sample_post(self.user1, hashtags="#party")
+
+        res = self.client.get(POST_URL, {"hashtags": "#art"})
+
+        self.assertEqual([item["id"] for item in res.data["results"]], [art.id])
+
+    def test_update_post_hashtags_syncs_tags(self):
+        post = sample_post(self.user1, hashtags="#art #music")
+        url = reverse("social_network:post-detail", args=[post.id])
+
+        self.client.patch(url, {"hashtags": "#music #travel"})
+
+        self.assertEqual(
+            list(post.tags.order_by("name").values_list("name", flat=True)),
+            ["music", "travel"],
+        )
+
+    def test_backfill_hashtags_command(self):
+        post = sample_post(self.user1)
+        Post.objects.filter(id=post.id).update(hashtags="#art, #music")
+
+        call_command("backfill_hashtags", stdout=StringIO())
+
+        self.assertEqual(
+            sorted(post.tags.values_list("name", flat=True)), ["art", "music"]
+        )
 
     def test_retrieve_post_detail(self):
         post1 = sample_post(self.user1)
@@ -152,6 +310,33 @@ class AuthenticatedProfileApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn(res.data, serializer.data)
 
+    def test_retrieve_post_detail_not_modified(self):
+        post = sample_post(self.user1)
+        url = reverse("social_network:post-detail", args=[post.id])
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(post_add_like_dislike_url(post.id), {"action": "like"})
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_retrieve_post_detail_modified_by_commenter_rename(self):
+        post = sample_post(self.user1)
+        Comment.objects.create(post=post, user=self.user2, text="text")
+        url = reverse("social_network:post-detail", args=[post.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.user2.first_name = "Renamed"
+        self.user2.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("Renamed", res.data["comments"][0]["user"])
+
     def test_add_comment_post_action(self):
         """This test add comment to the post of user that current user is following."""
         url_follow = profile_follow_or_unfollow_url(self.profile2.id)
@@ -222,6 +407,69 @@ class AuthenticatedProfileApiTests(TestCase):
         post_from_response = Like.objects.get(post=post)
         self.assertEqual(payload[field], getattr(post_from_response, field))
 
+    def test_repeat_same_reaction_rejected(self):
+        post = sample_post(self.user2)
+        url_add_like = post_add_like_dislike_url(post.id)
+        self.client.post(url_add_like, {"action": "like"})
+
+        res = self.client.post(url_add_like, {"action": "like"})
+        post.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["non_field_errors"], ["You have already like this post."]
+        )
+        self.assertEqual(Like.objects.filter(post=post).count(), 1)
+        self.assertEqual(post.likes_count, 1)
+
+    def test_reaction_response(self):
+        post = sample_post(self.user2)
+
+        res = self.client.post(post_add_like_dislike_url(post.id), {"action": "like"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data, {"action": "like"})
+
+    def test_reactions_update_post_counters(self):
+        post = sample_post(self.user2)
+        url_add_like = post_add_like_dislike_url(post.id)
+
+        self.client.post(url_add_like, {"action": "like"})
+        post.refresh_from_db()
+        self.assertEqual((post.likes_count, post.dislikes_count), (1, 0))
+
+        self.client.post(url_add_like, {"action": "dislike"})
+        post.refresh_from_db()
+        self.assertEqual((post.likes_count, post.dislikes_count), (0, 1))
+
+        self.client.post(url_add_like, {"action": "cancel"})
+        post.refresh_from_db()
+        self.assertEqual((post.likes_count, post.dislikes_count), (0, 0))
+
+    def test_add_comment_updates_post_counter(self):
+        post = sample_post(self.user2)
+        url_add_comment = reverse("social_network:post-add-comment", args=[post.id])
+
+        self.client.post(url_add_comment, {"text": "first"})
+        self.client.post(url_add_comment, {"text": "second"})
+        post.refresh_from_db()
+
+        self.assertEqual(post.comments_count, 2)
+
+    def test_reconcile_counters_command(self):
+        post = sample_post(self.user2)
+        Like.objects.create(post=post, user=self.user1, action="like")
+        Like.objects.create(post=post, user=self.user3, action="dislike")
+        Comment.objects.create(post=post, user=self.user1, text="text")
+        Post.objects.filter(id=post.id).update(likes_count=5, comments_count=0)
+
+        call_command("reconcile_counters", stdout=StringIO())
+        post.refresh_from_db()
+
+        self.assertEqual(
+            (post.likes_count, post.dislikes_count, post.comments_count), (1, 1, 1)
+        )
+
     def test_my_posts_list_posts_action(self):
         """List of user own posts."""
         for user in (self.user1, self.user2, self.user3, self.user1):
@@ -234,7 +482,7 @@ class AuthenticatedProfileApiTests(TestCase):
         serializer = PostListSerializer(queryset, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_liked_posts_list_posts_action(self):
         """List of current user liked posts."""
@@ -256,4 +504,63 @@ class AuthenticatedProfileApiTests(TestCase):
         serializer = PostListSerializer(queryset, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+
+class BulkReactionApiTests(TestCase):
+    url = reverse("social_network:post-bulk-add-like-dislike")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test1@test1.com", password="TestUser1"
+        )
+        self.client.force_authenticate(self.user)
+        self.posts = [sample_post(self.user) for _ in range(5)]
+
+    def test_bulk_reactions_results(self):
+        post1, post2 = self.posts[:2]
+        Like.objects.create(user=self.user, post=post2, action="like")
+        Post.objects.filter(id=post2.id).update(likes_count=1)
+        payload = [
+            {"post_id": post1.id, "action": "like"},
+            {"post_id": post2.id, "action": "like"},
+            {"post_id": post2.id, "action": "dislike"},
+            {"post_id": 0, "action": "like"},
+        ]
+
+        res = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in res.data],
+            ["created", "unchanged", "updated", "not_found"],
+        )
+        post1.refresh_from_db()
+        post2.refresh_from_db()
+        self.assertEqual((post1.likes_count, post1.dislikes_count), (1, 0))
+        self.assertEqual((post2.likes_count, post2.dislikes_count), (0, 1))
+        self.assertEqual(
+            dict(Like.objects.values_list("post_id", "action")),
+            {post1.id: "like", post2.id: "dislike"},
+        )
+
+    def test_bulk_reactions_constant_queries(self):
+        def payload(posts, action):
+            return [{"post_id": post.id, "action": action} for post in posts]
+
+        with CaptureQueriesContext(connection) as single:
+            self.client.post(self.url, payload(self.posts[:1], "like"), format="json")
+        with CaptureQueriesContext(connection) as batch:
+            self.client.post(self.url, payload(self.posts, "dislike"), format="json")
+
+        self.assertEqual(len(single), len(batch))
+
+    def test_bulk_reactions_invalid_action(self):
+        res = self.client.post(
+            self.url,
+            [{"post_id": self.posts[0].id, "action": "love"}],
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,13 +1,21 @@
 import os
 import tempfile
+from io import StringIO
+from unittest import mock
 
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
+from social_network import renditions
+from social_network.graph import FollowGraph
 from social_network.models import Profile
 from social_network.serializers import (
     ProfileSerializer,
@@ -68,7 +76,24 @@ class AuthenticatedProfileApiTests(TestCase):
         serializer = ProfileListSerializer(profiles, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_profiles_queries_do_not_grow_with_followers(self):
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(PROFILE_URL)
+            return len(queries)
+
+        before = list_queries()
+        for index in range(10):
+            user = get_user_model().objects.create_user(
+                email=f"follower{index}@test.com", password="TestUser"
+            )
+            Profile.objects.create(user=user, gender="Male").following.add(
+                self.profile1, self.profile2
+            )
+
+        self.assertEqual(list_queries(), before)
 
     def test_filter_profile_by_first_name(self):
         response = self.client.get(PROFILE_URL, {"first_name": "test1"})
@@ -76,8 +101,8 @@ class AuthenticatedProfileApiTests(TestCase):
         serializer1 = ProfileListSerializer(self.profile1)
         serializer2 = ProfileListSerializer(self.profile2)
 
-        self.assertIn(serializer1.data, response.data)
-        self.assertNotIn(serializer2.data, response.data)
+        self.assertIn(serializer1.data, response.data["results"])
+        self.assertNotIn(serializer2.data, response.data["results"])
 
     def test_filter_profile_by_last_name(self):
         response = self.client.get(PROFILE_URL, {"last_name": "test1"})
@@ -85,8 +110,8 @@ class AuthenticatedProfileApiTests(TestCase):
         serializer1 = ProfileListSerializer(self.profile1)
         serializer2 = ProfileListSerializer(self.profile2)
 
-        self.assertIn(serializer1.data, response.data)
-        self.assertNotIn(serializer2.data, response.data)
+        self.assertIn(serializer1.data, response.data["results"])
+        self.assertNotIn(serializer2.data, response.data["results"])
 
     def test_filter_profile_by_birth_date(self):
         response = self.client.get(PROFILE_URL, {"birth_date": "2001-01-01"})
@@ -94,8 +119,8 @@ class AuthenticatedProfileApiTests(TestCase):
         serializer1 = ProfileListSerializer(self.profile1)
         serializer2 = ProfileListSerializer(self.profile2)
 
-        self.assertIn(serializer1.data, response.data)
-        self.assertNotIn(serializer2.data, response.data)
+        self.assertIn(serializer1.data, response.data["results"])
+        self.assertNotIn(serializer2.data, response.data["results"])
 
     def test_retrieve_profile_detail(self):
         url = reverse("social_network:profile-detail", args=[self.profile1.id])
@@ -105,6 +130,62 @@ class AuthenticatedProfileApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_retrieve_profile_detail_not_modified(self):
+        url = reverse("social_network:profile-detail", args=[self.profile2.id])
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(profile_follow_or_unfollow_url(self.profile2.id))
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_retrieve_profile_detail_modified_by_follower_rename(self):
+        self.profile1.following.add(self.profile2)
+        url = reverse("social_network:profile-detail", args=[self.profile2.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.user1.first_name = "Renamed"
+        self.user1.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("Renamed", res.data["followers"][0])
+
+    def test_list_profiles_fast_path_matches_serializer(self):
+        self.profile1.bio = "bio"
+        self.profile1.save()
+        self.profile2.following.add(self.profile1)
+
+        fast = self.client.get(PROFILE_URL, {"page_size": 2})
+        with override_settings(FAST_LIST_RENDERING=False):
+            slow = self.client.get(PROFILE_URL, {"page_size": 2})
+
+        self.assertEqual(fast.content, slow.content)
+
+    def test_list_profiles_sparse_fields(self):
+        self.profile2.following.add(self.profile1)
+
+        res = self.client.get(PROFILE_URL, {"fields": "id", "expand": "followers"})
+
+        self.assertEqual(
+            res.data["results"][0],
+            {"id": self.profile1.id, "followers": ["test2 FN test2 LN"]},
+        )
+
+    def test_retrieve_profile_detail_sparse_fields(self):
+        url = reverse("social_network:profile-detail", args=[self.profile1.id])
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(2):
+            res = self.client.get(url, {"fields": "id,bio"}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"id": self.profile1.id, "bio": None})
+
     def test_upload_image_to_profile(self):
         url = reverse("social_network:profile-upload-image", args=[self.profile1.id])
         with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
@@ -153,6 +234,59 @@ class AuthenticatedProfileApiTests(TestCase):
             self.user1.profile.following.filter(id=self.profile2.id).exists()
         )
 
+    def test_follow_profile_post_is_idempotent(self):
+        url = profile_follow_or_unfollow_url(self.profile2.id)
+        self.client.post(url)
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["detail"], f"Now you are following user {self.profile2}."
+        )
+        self.assertEqual(self.profile1.following.count(), 1)
+
+    def test_unfollow_profile_delete(self):
+        url = profile_follow_or_unfollow_url(self.profile2.id)
+        self.client.post(url)
+        response = self.client.delete(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["detail"],
+            f"Now you are unfollowing user {self.profile2}.",
+        )
+        self.assertFalse(self.profile1.following.exists())
+
+    def test_follow_updates_counters(self):
+        url = profile_follow_or_unfollow_url(self.profile2.id)
+        self.client.post(url)
+        self.profile3.following.add(self.profile2)
+        self.profile1.refresh_from_db()
+        self.profile2.refresh_from_db()
+
+        self.assertEqual(self.profile1.following_count, 1)
+        self.assertEqual(self.profile2.followers_count, 2)
+
+        self.client.delete(url)
+        self.profile2.followers.clear()
+        self.profile1.refresh_from_db()
+        self.profile2.refresh_from_db()
+
+        self.assertEqual(self.profile1.following_count, 0)
+        self.assertEqual(self.profile2.followers_count, 0)
+
+    def test_reconcile_counters_command_repairs_profiles(self):
+        self.profile1.following.add(self.profile2, self.profile3)
+        Profile.objects.update(followers_count=7, following_count=7)
+
+        call_command("reconcile_counters", stdout=StringIO())
+        self.profile1.refresh_from_db()
+        self.profile2.refresh_from_db()
+
+        self.assertEqual(self.profile1.following_count, 2)
+        self.assertEqual(self.profile1.followers_count, 0)
+        self.assertEqual(self.profile2.followers_count, 1)
+
     def test_following_list_profile_action(self):
         for prof_id in (self.profile2.id, self.profile3.id):
             url = profile_follow_or_unfollow_url(prof_id)
@@ -164,7 +298,7 @@ class AuthenticatedProfileApiTests(TestCase):
         serializer = ProfileListSerializer(pofile_following, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_followers_list_profile_action(self):
         for user in (self.user2, self.user3):
@@ -179,4 +313,142 @@ class AuthenticatedProfileApiTests(TestCase):
         serializer = ProfileListSerializer(pofile_followers, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_profile_detail_followers_any_profile(self):
+        self.profile1.followers.add(self.profile2, self.profile3)
+        url = reverse(
+            "social_network:profile-detail-followers", args=[self.profile1.id]
+        )
+
+        self.client.force_authenticate(self.user3)
+        res = self.client.get(url, {"page_size": 1})
+        ids = [item["id"] for item in res.data["results"]]
+        res = self.client.get(res.data["next"])
+        ids.extend(item["id"] for item in res.data["results"])
+
+        self.assertEqual(ids, [self.profile2.id, self.profile3.id])
+        self.assertIsNone(res.data["next"])
+
+    def test_profile_detail_following_any_profile(self):
+        self.profile2.following.add(self.profile3)
+        self.profile3.refresh_from_db()
+        url = reverse(
+            "social_network:profile-detail-following", args=[self.profile2.id]
+        )
+
+        res = self.client.get(url)
+
+        self.assertEqual(
+            res.data["results"], ProfileListSerializer([self.profile3], many=True).data
+        )
+
+    def test_retrieve_profile_detail_caps_inline_follows(self):
+        limit = ProfileSerializer.inline_follows_limit
+        for index in range(limit + 2):
+            user = get_user_model().objects.create_user(
+                email=f"follower{index}@test.com", password="TestUser"
+            )
+            Profile.objects.create(user=user, gender="Male").following.add(
+                self.profile2
+            )
+
+        url = reverse("social_network:profile-detail", args=[self.profile2.id])
+        res = self.client.get(url)
+
+        self.assertEqual(len(res.data["followers"]), limit)
+        self.assertEqual(res.data["followers_count"], limit + 2)
+
+    def test_autocomplete_profiles_by_name_prefix(self):
+        self.user2.first_name, self.user2.last_name = "Johanna", "Smith"
+        self.user2.save()
+        self.user3.first_name, self.user3.last_name = "John", "Smithers"
+        self.user3.save()
+        self.profile1.following.add(self.profile3)
+        url = reverse("social_network:profile-autocomplete")
+
+        res = self.client.get(url, {"q": "joh"})
+        self.assertEqual(
+            [item["id"] for item in res.data], [self.profile3.id, self.profile2.id]
+        )
+
+        res = self.client.get(url, {"q": "Smith joha"})
+        self.assertEqual([item["id"] for item in res.data], [self.profile2.id])
+
+        res = self.client.get(url, {"q": "joh", "limit": 1})
+        self.assertEqual([item["id"] for item in res.data], [self.profile3.id])
+
+    def test_rebuild_name_index_command(self):
+        get_user_model().objects.filter(id=self.user2.id).update(first_name="Zelda")
+
+        call_command("rebuild_name_index", stdout=StringIO())
+        res = self.client.get(
+            reverse("social_network:profile-autocomplete"), {"q": "zel"}
+        )
+
+        self.assertEqual([item["id"] for item in res.data], [self.profile2.id])
+
+    def test_compute_suggestions_ranks_friends_of_friends(self):
+        users = [
+            get_user_model().objects.create_user(
+                email=f"user{index}@test.com", password="TestUser"
+            )
+            for index in range(2)
+        ]
+        profile4, profile5 = (
+            Profile.objects.create(user=user, gender="Male") for user in users
+        )
+        self.profile1.following.add(self.profile2, self.profile3)
+        self.profile2.following.add(self.profile3, profile4, profile5)
+        self.profile3.following.add(profile5)
+
+        call_command(
+            "compute_suggestions", "--top-k", "5", "--workers", "1", stdout=StringIO()
+        )
+        res = self.client.get(reverse("social_network:profile-suggestions"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in res.data], [profile5.id, profile4.id])
+
+    def test_follow_graph_skips_edges_of_unknown_profiles(self):
+        graph = FollowGraph.from_edges([1, 2, 3], [(1, 2), (1, 9), (2, 3), (9, 1)])
+
+        self.assertEqual(list(graph.following(0)), [1])
+        self.assertEqual(list(graph.following(1)), [2])
+        self.assertEqual(graph.suggest(0, 5), [(3, 1)])
+
+    @override_settings(IMAGE_RENDITIONS_EAGER=True)
+    def test_upload_image_generates_renditions(self):
+        url = reverse("social_network:profile-upload-image", args=[self.profile1.id])
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
+            Image.new("RGB", (1000, 500)).save(ntf, format="JPEG")
+            ntf.seek(0)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(url, {"image": ntf}, format="multipart")
+        self.profile1.refresh_from_db()
+
+        renditions = self.profile1.image_renditions
+        self.assertEqual(renditions["source"], self.profile1.image.name)
+        with Image.open(default_storage.path(renditions["thumbnail"])) as thumbnail:
+            self.assertEqual(thumbnail.size, (150, 75))
+        with Image.open(default_storage.path(renditions["webp"])) as webp:
+            self.assertEqual(webp.format, "WEBP")
+
+        res = self.client.get(
+            reverse("social_network:profile-detail", args=[self.profile1.id])
+        )
+        self.assertEqual(
+            set(res.data["image_renditions"]), {"thumbnail", "medium", "webp"}
+        )
+
+    def test_background_rendition_failure_logged(self):
+        with (
+            mock.patch.object(
+                renditions, "generate_renditions", side_effect=OSError("corrupt")
+            ),
+            mock.patch.object(renditions, "connections"),
+            self.assertLogs("social_network.renditions", "ERROR") as logs,
+        ):
+            renditions._generate_in_background(Profile, self.profile1.pk)
+
+        self.assertIn(f"Profile {self.profile1.pk}", logs.output[0])
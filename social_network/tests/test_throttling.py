@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from social_network.models import Post
+from social_network.throttling import (
+    CacheBackend,
+    DatabaseBackend,
+    MemoryBackend,
+    get_backend,
+    parse_rate,
+)
+
+
+class TokenBucketBackendTests(TestCase):
+    def assert_token_bucket(self, backend):
+        self.assertEqual(backend.consume("key", 2, 0.5), 0)
+        self.assertEqual(backend.consume("key", 2, 0.5), 0)
+        self.assertAlmostEqual(backend.consume("key", 2, 0.5), 2, delta=0.1)
+        self.assertEqual(backend.consume("other", 2, 0.5), 0)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("30/m"), (30, 0.5))
+        self.assertEqual(parse_rate("10/sec"), (10, 10))
+
+    def test_memory_backend(self):
+        self.assert_token_bucket(MemoryBackend())
+
+    def test_database_backend_uses_one_query(self):
+        backend = DatabaseBackend()
+        with self.assertNumQueries(1):
+            backend.consume("key", 2, 0.5)
+        with self.assertNumQueries(1):
+            self.assertEqual(backend.consume("key", 2, 0.5), 0)
+        self.assertAlmostEqual(backend.consume("key", 2, 0.5), 2, delta=0.1)
+
+    def test_cache_backend(self):
+        backend = CacheBackend()
+        backend.clear()
+        self.assertEqual(backend.consume("key", 2, 0.5), 0)
+        self.assertEqual(backend.consume("key", 2, 0.5), 0)
+        self.assertGreater(backend.consume("key", 2, 0.5), 0)
+
+
+@override_settings(RATE_LIMITS={"default": "3/m", "comment": "1/m"})
+class ThrottledApiTests(TestCase):
+    def setUp(self):
+        get_backend().clear()
+        self.addCleanup(get_backend().clear)
+        self.user = get_user_model().objects.create_user(
+            email="test1@test1.com", password="TestUser1"
+        )
+        self.post = Post.objects.create(user=self.user, title="Test", text="text")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_policy_per_endpoint(self):
+        url = reverse("social_network:post-add-comment", args=[self.post.id])
+        res = self.client.post(url, {"text": "first"})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(url, {"text": "second"})
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "60")
+
+        res = self.client.get(reverse("social_network:post-list"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_async_views_are_throttled(self):
+        headers = {"Authorization": f"Token {Token.objects.create(user=self.user)}"}
+        url = reverse("social_network:async-post-list")
+        for _ in range(3):
+            self.assertEqual(
+                self.client.get(url, headers=headers).status_code, status.HTTP_200_OK
+            )
+
+        res = self.client.get(url, headers=headers)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "20")
+
+    def login(self, email, **extra):
+        return APIClient().post(
+            reverse("user:login"), {"email": email, "password": "x"}, **extra
+        )
+
+    @override_settings(RATE_LIMITS={"login": "2/m"})
+    def test_login_is_throttled_per_client(self):
+        for _ in range(2):
+            res = self.login("test1@test1.com")
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = APIClient().post(
+            reverse("user:login"),
+            {"email": "test1@test1.com", "password": "TestUser1"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+
+        res = self.login("other@test.com", HTTP_X_FORWARDED_FOR="198.51.100.7")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(RATE_LIMITS={"login": "2/m"})
+    def test_login_is_throttled_per_email(self):
+        for address in ("198.51.100.1", "198.51.100.2"):
+            res = self.login("test1@test1.com", REMOTE_ADDR=address)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.login("Test1@test1.com", REMOTE_ADDR="198.51.100.3")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
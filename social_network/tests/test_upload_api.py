@@ -0,0 +1,157 @@
+import os
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from social_network.models import Profile, Upload
+
+UPLOAD_URL = reverse("social_network:upload-list")
+
+
+def upload_chunk_url(upload_id):
+    return reverse("social_network:upload-chunk", args=[upload_id])
+
+
+def upload_finalize_url(upload_id):
+    return reverse("social_network:upload-finalize", args=[upload_id])
+
+
+def sample_image_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (20, 20)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class ChunkedUploadApiTests(TestCase):
+    def setUp(self):
+        self.upload_root = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            CHUNKED_UPLOAD_ROOT=self.upload_root.name
+        )
+        self.settings_override.enable()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="TestUser1"
+        )
+        self.profile = Profile.objects.create(
+            user=self.user, gender="Male", birth_date="2001-01-01"
+        )
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.upload_root.cleanup()
+
+    def put_chunk(self, upload_id, offset, data):
+        return self.client.put(
+            upload_chunk_url(upload_id),
+            data,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def upload(self, data):
+        res = self.client.post(UPLOAD_URL, {"filename": "image.jpg", "size": len(data)})
+        upload_id = res.data["id"]
+        middle = len(data) // 2
+        self.put_chunk(upload_id, 0, data[:middle])
+        self.put_chunk(upload_id, middle, data[middle:])
+        return upload_id
+
+    def test_upload_in_chunks(self):
+        data = sample_image_bytes()
+        res = self.client.post(UPLOAD_URL, {"filename": "image.jpg", "size": len(data)})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        upload_id = res.data["id"]
+
+        res = self.put_chunk(upload_id, 0, data[:100])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["offset"], 100)
+
+        res = self.put_chunk(upload_id, 50, data[100:])
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["offset"], 100)
+
+        res = self.client.get(reverse("social_network:upload-detail", args=[upload_id]))
+        self.assertEqual(res.data["offset"], 100)
+
+        res = self.put_chunk(upload_id, 100, data[100:])
+        self.assertEqual(res.data["offset"], len(data))
+
+        res = self.client.post(upload_finalize_url(upload_id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], Upload.StatusChoices.COMPLETE)
+
+    def test_chunk_past_declared_size_rejected(self):
+        res = self.client.post(UPLOAD_URL, {"filename": "image.jpg", "size": 10})
+
+        res = self.put_chunk(res.data["id"], 0, b"x" * 11)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_finalize_incomplete_upload(self):
+        res = self.client.post(UPLOAD_URL, {"filename": "image.jpg", "size": 10})
+
+        res = self.client.post(upload_finalize_url(res.data["id"]))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_finalize_invalid_image(self):
+        upload_id = self.upload(b"not an image")
+
+        res = self.client.post(upload_finalize_url(upload_id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(IMAGE_RENDITIONS_EAGER=True)
+    def test_upload_image_to_profile_from_upload(self):
+        upload_id = self.upload(sample_image_bytes())
+        self.client.post(upload_finalize_url(upload_id))
+        url = reverse("social_network:profile-upload-image", args=[self.profile.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(url, {"upload": upload_id})
+        self.profile.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(os.path.exists(self.profile.image.path))
+        self.assertFalse(Upload.objects.filter(id=upload_id).exists())
+        self.assertFalse(
+            os.path.exists(os.path.join(self.upload_root.name, str(upload_id)))
+        )
+
+    def test_upload_kept_when_save_fails(self):
+        upload_id = self.upload(sample_image_bytes())
+        self.client.post(upload_finalize_url(upload_id))
+        url = reverse("social_network:profile-upload-image", args=[self.profile.id])
+
+        with mock.patch.object(Profile, "save", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post(url, {"upload": upload_id})
+
+        self.assertTrue(Upload.objects.filter(id=upload_id).exists())
+        self.assertTrue(
+            os.path.exists(os.path.join(self.upload_root.name, str(upload_id)))
+        )
+
+    def test_upload_of_other_user_rejected(self):
+        other = get_user_model().objects.create_user(
+            email="other@test.com", password="TestUser2"
+        )
+        upload_id = self.upload(sample_image_bytes())
+        self.client.post(upload_finalize_url(upload_id))
+        self.client.force_authenticate(other)
+
+        res = self.client.post(
+            reverse("social_network:post-list"), {"upload": upload_id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
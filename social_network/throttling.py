@@ -0,0 +1,193 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+from social_network.models import RateLimitBucket
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str):
+    """Parse "<capacity>/<period>" into (capacity, tokens refilled per second)."""
+    number, period = rate.split("/")
+    capacity = int(number)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class MemoryBackend:
+    """Token buckets in a bounded per-process dict."""
+
+    def __init__(self, max_size=100_000):
+        self.max_size = max_size
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, rate: float) -> float:
+        """Take a token from the bucket, return 0 or seconds until one is free."""
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1 if not wait else tokens, now)
+            if len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+        return wait
+
+    async def aconsume(self, key: str, capacity: int, rate: float) -> float:
+        return self.consume(key, capacity, rate)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseBackend:
+    """Token buckets shared by every process through `RateLimitBucket` rows.
+
+    Refill and take happen in one upsert, whose SET expressions all read the
+    row as it was before the statement.
+    """
+
+    table = RateLimitBucket._meta.db_table
+    refilled = (
+        f"CASE WHEN {table}.tokens + (%(now)s - {table}.updated) * %(rate)s "
+        f"> %(capacity)s THEN %(capacity)s "
+        f"ELSE {table}.tokens + (%(now)s - {table}.updated) * %(rate)s END"
+    )
+    sql = (
+        f"INSERT INTO {table} (key, tokens, updated, allowed) "
+        "VALUES (%(key)s, %(capacity)s - 1, %(now)s, TRUE) "
+        "ON CONFLICT (key) DO UPDATE SET "
+        f"tokens = CASE WHEN {refilled} >= 1 THEN {refilled} - 1 "
+        f"ELSE {refilled} END, "
+        f"allowed = {refilled} >= 1, "
+        "updated = %(now)s "
+        "RETURNING tokens, allowed"
+    )
+
+    def consume(self, key: str, capacity: int, rate: float) -> float:
+        params = {"key": key, "capacity": capacity, "rate": rate, "now": time.time()}
+        with connection.cursor() as cursor:
+            cursor.execute(self.sql, params)
+            tokens, allowed = cursor.fetchone()
+        return 0.0 if allowed else (1 - tokens) / rate
+
+    async def aconsume(self, key: str, capacity: int, rate: float) -> float:
+        return await sync_to_async(self.consume)(key, capacity, rate)
+
+    def clear(self) -> None:
+        RateLimitBucket.objects.all().delete()
+
+    def purge(self, max_age: float) -> int:
+        """Delete buckets untouched for max_age seconds."""
+        deleted, _ = RateLimitBucket.objects.filter(
+            updated__lt=time.time() - max_age
+        ).delete()
+        return deleted
+
+
+class CacheBackend:
+    """Approximate token buckets with one counter per refill window.
+
+    The cache API's only atomic read-modify-write is `incr`, so a bucket is a
+    counter that allows `capacity` requests per `capacity / rate` seconds
+    and resets at the end of the window instead of refilling gradually.
+    """
+
+    def __init__(self, alias="default"):
+        self.cache = caches[alias]
+
+    def consume(self, key: str, capacity: int, rate: float) -> float:
+        window = capacity / rate
+        now = time.time()
+        start = now - now % window
+        window_key = f"rate-limit:{key}:{int(start)}"
+        try:
+            count = self.cache.incr(window_key)
+        except ValueError:
+            # Another process may create the counter between incr and add.
+            if self.cache.add(window_key, 1, math.ceil(window)):
+                count = 1
+            else:
+                count = self.cache.incr(window_key)
+        return 0.0 if count <= capacity else start + window - now
+
+    async def aconsume(self, key: str, capacity: int, rate: float) -> float:
+        return await sync_to_async(self.consume)(key, capacity, rate)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        backend = getattr(
+            settings, "RATE_LIMIT_BACKEND", "social_network.throttling.MemoryBackend"
+        )
+        _backend = import_string(backend)()
+    return _backend
+
+
+def get_policy(scope: str):
+    rate = getattr(settings, "RATE_LIMITS", {}).get(scope)
+    return parse_rate(rate) if rate else None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttle requests per user (or client address) and view scope.
+
+    Views pick a policy from `RATE_LIMITS` with `throttle_scope`, and fall
+    back to the "default" policy. Views may also name a request field in
+    `throttle_data_field`, such as the email a login is attempted for, whose
+    value gets a bucket of its own next to the client's.
+    """
+
+    def get_key(self, request, scope: str) -> str:
+        if request.user and request.user.is_authenticated:
+            return f"{scope}:user:{request.user.pk}"
+        return f"{scope}:ip:{self.get_ident(request)}"
+
+    def get_keys(self, request, view, scope: str) -> list:
+        keys = [self.get_key(request, scope)]
+        field = getattr(view, "throttle_data_field", None)
+        value = field and request.data.get(field)
+        if isinstance(value, str) and value:
+            keys.append(f"{scope}:{field}:{value.strip().lower()}")
+        return keys
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None) or "default"
+        policy = get_policy(scope)
+        if policy is None:
+            return True
+
+        backend = get_backend()
+        self._wait = max(
+            backend.consume(key, *policy) for key in self.get_keys(request, view, scope)
+        )
+        return not self._wait
+
+    async def aallow_request(self, request, scope="default"):
+        policy = get_policy(scope)
+        if policy is None:
+            return True
+
+        key = self.get_key(request, scope)
+        self._wait = await get_backend().aconsume(key, *policy)
+        return not self._wait
+
+    def wait(self):
+        return self._wait
@@ -0,0 +1,56 @@
+from django.db.models import F
+
+from social_network.models import Post, Profile, TimelineEntry
+
+BATCH_SIZE = 1000
+
+
+def _insert_entries(user_ids, posts):
+    entries = [
+        TimelineEntry(user_id=user_id, post_id=post_id, created=created)
+        for user_id in user_ids
+        for post_id, created in posts
+    ]
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def fan_out_post(post: Post) -> None:
+    """Write a new post into the timelines of its author and all followers."""
+    follower_ids = Profile.objects.filter(following__user_id=post.user_id).values_list(
+        "user_id", flat=True
+    )
+    _insert_entries({post.user_id, *follower_ids}, [(post.id, post.created)])
+
+
+def add_author_to_timeline(user_id: int, author_id: int) -> None:
+    posts = Post.objects.filter(user_id=author_id).values_list("id", "created")
+    _insert_entries([user_id], posts.iterator(chunk_size=BATCH_SIZE))
+
+
+def remove_author_from_timeline(user_id: int, author_id: int) -> None:
+    TimelineEntry.objects.filter(user_id=user_id, post__user_id=author_id).delete()
+
+
+def rebuild_timeline(user_id: int) -> None:
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    author_ids = {
+        user_id,
+        *Profile.objects.filter(followers__user_id=user_id).values_list(
+            "user_id", flat=True
+        ),
+    }
+    posts = Post.objects.filter(user_id__in=author_ids).values_list("id", "created")
+    _insert_entries([user_id], posts.iterator(chunk_size=BATCH_SIZE))
+
+
+def feed_posts(user_id: int, queryset=None):
+    """Posts in a user's timeline, annotated with the timeline entry columns
+    the feed is ordered and paginated on."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.filter(timeline_entries__user_id=user_id).annotate(
+        feed_created=F("timeline_entries__created"),
+        feed_post=F("timeline_entries__post_id"),
+    )
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from social_network.models import HashtagCounter
+
+MINUTE = HashtagCounter.GranularityChoices.MINUTE
+HOUR = HashtagCounter.GranularityChoices.HOUR
+
+HOUR_RETENTION = timedelta(days=7)
+
+
+def truncate(moment, granularity):
+    moment = moment.replace(second=0, microsecond=0)
+    if granularity == HOUR:
+        moment = moment.replace(minute=0)
+    return moment
+
+
+def record_hashtags(hashtag_ids, moment=None) -> None:
+    """Increment the current minute bucket of every given hashtag."""
+    if not hashtag_ids:
+        return
+
+    bucket = truncate(moment or timezone.now(), MINUTE)
+    HashtagCounter.objects.bulk_create(
+        [
+            HashtagCounter(hashtag_id=hashtag_id, granularity=MINUTE, bucket=bucket)
+            for hashtag_id in hashtag_ids
+        ],
+        ignore_conflicts=True,
+    )
+    HashtagCounter.objects.filter(
+        granularity=MINUTE, bucket=bucket, hashtag_id__in=hashtag_ids
+    ).update(count=F("count") + 1)
+
+
+def trending_hashtags(window: timedelta, limit: int, now=None) -> list:
+    """Return the top hashtags by post count over the trailing window.
+
+    Minute buckets are rolled up into hour buckets once their hour is older
+    than an hour, so a window never reads more than its hour buckets plus
+    the minute buckets that are not rolled up yet.
+    """
+    since = (now or timezone.now()) - window
+    buckets = Q(granularity=MINUTE, bucket__gte=truncate(since, MINUTE))
+    if window > timedelta(hours=1):
+        buckets |= Q(granularity=HOUR, bucket__gte=truncate(since, HOUR))
+
+    return list(
+        HashtagCounter.objects.filter(buckets)
+        .values(name=F("hashtag__name"))
+        .annotate(count=Sum("count"))
+        .order_by("-count", "name")[:limit]
+    )
+
+
+def rollup_counters(now=None) -> tuple:
+    """Fold old minute buckets into hour buckets and prune expired hours.
+
+    Returns the number of rolled up minute buckets and pruned hour buckets.
+    """
+    now = now or timezone.now()
+    cutoff = truncate(now - timedelta(hours=1), HOUR)
+
+    with transaction.atomic():
+        minutes = HashtagCounter.objects.filter(granularity=MINUTE, bucket__lt=cutoff)
+        totals = {
+            (row["hashtag_id"], row["hour"]): row["total"]
+            for row in minutes.annotate(hour=TruncHour("bucket"))
+            .values("hashtag_id", "hour")
+            .annotate(total=Sum("count"))
+            .order_by()
+        }
+        hours = {
+            (counter.hashtag_id, counter.bucket): counter
+            for counter in HashtagCounter.objects.filter(
+                granularity=HOUR,
+                bucket__in={hour for _, hour in totals},
+                hashtag_id__in={hashtag_id for hashtag_id, _ in totals},
+            )
+        }
+
+        updated, created = [], []
+        for key, total in totals.items():
+            if key in hours:
+                hours[key].count += total
+                updated.append(hours[key])
+            else:
+                hashtag_id, hour = key
+                created.append(
+                    HashtagCounter(
+                        hashtag_id=hashtag_id,
+                        granularity=HOUR,
+                        bucket=hour,
+                        count=total,
+                    )
+                )
+        HashtagCounter.objects.bulk_update(updated, ["count"])
+        HashtagCounter.objects.bulk_create(created)
+        rolled_up, _ = minutes.delete()
+
+    pruned, _ = HashtagCounter.objects.filter(
+        granularity=HOUR, bucket__lt=now - HOUR_RETENTION
+    ).delete()
+    return rolled_up, pruned
@@ -0,0 +1,78 @@
+import os
+from datetime import timedelta
+
+from PIL import Image
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from social_network.models import Upload
+
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class UploadOffsetMismatch(Exception):
+    def __init__(self, offset):
+        super().__init__(f"Expected offset {offset}.")
+        self.offset = offset
+
+
+def upload_path(upload: Upload) -> str:
+    return os.path.join(settings.CHUNKED_UPLOAD_ROOT, str(upload.id))
+
+
+def append_chunk(upload: Upload, offset: int, stream, length: int) -> int:
+    """Stream a chunk to disk at offset in fixed-size blocks, return new offset."""
+    if offset != upload.offset:
+        raise UploadOffsetMismatch(upload.offset)
+
+    path = upload_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "r+b" if os.path.exists(path) else "wb") as chunk_file:
+        chunk_file.seek(offset)
+        remaining = length
+        while remaining > 0:
+            block = stream.read(min(STREAM_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            chunk_file.write(block)
+            remaining -= len(block)
+        chunk_file.truncate()
+
+    new_offset = offset + length - remaining
+    if not Upload.objects.filter(pk=upload.pk, offset=offset).update(offset=new_offset):
+        raise UploadOffsetMismatch(
+            Upload.objects.values_list("offset", flat=True).get(pk=upload.pk)
+        )
+    upload.offset = new_offset
+    return new_offset
+
+
+def finalize_upload(upload: Upload) -> None:
+    """Decode the assembled image once and mark the upload complete."""
+    with Image.open(upload_path(upload)) as image:
+        image.load()
+
+    upload.status = Upload.StatusChoices.COMPLETE
+    upload.save(update_fields=["status"])
+
+
+def open_upload(upload: Upload) -> File:
+    return File(open(upload_path(upload), "rb"), name=upload.filename)
+
+
+def delete_upload(upload: Upload) -> None:
+    try:
+        os.remove(upload_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+def purge_stale_uploads(max_age: timedelta) -> int:
+    stale = Upload.objects.filter(created__lt=timezone.now() - max_age)
+    purged = 0
+    for upload in stale.iterator():
+        delete_upload(upload)
+        purged += 1
+    return purged
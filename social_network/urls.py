@@ -1,10 +1,14 @@
+from django.urls import path
 from rest_framework import routers
 
+from social_network import async_views
 from social_network.views import (
     ProfileViewSet,
     PostViewSet,
     CommentViewSet,
     LikeViewSet,
+    HashtagViewSet,
+    UploadViewSet,
 )
 
 app_name = "social_network"
@@ -14,5 +18,17 @@ router.register("profiles", ProfileViewSet)
 router.register("posts", PostViewSet)
 router.register("comments", CommentViewSet)
 router.register("likes", LikeViewSet)
+router.register("hashtags", HashtagViewSet)
+router.register("uploads", UploadViewSet)
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("async/posts/", async_views.post_feed, name="async-post-list"),
+    path("async/posts/<int:pk>/", async_views.post_detail, name="async-post-detail"),
+    path("async/profiles/", async_views.profile_list, name="async-profile-list"),
+    path(
+        "async/profiles/<int:pk>/",
+        async_views.profile_detail,
+        name="async-profile-detail",
+    ),
+    path("async/stream/", async_views.live_feed, name="async-live-feed"),
+] + router.urls
@@ -1,14 +1,38 @@
-from django.db.models import Count, Q
+from datetime import timedelta
+
+from PIL import Image
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from social_network.models import Profile, Post, Comment, Like
+from social_network.counters import increment_comments
+from social_network.etags import post_etag, profile_etag, vary_etag
+from social_network.fast_lists import ValuesRenderer
+from social_network.follows import follow, unfollow, toggle_follow
+from social_network.models import Profile, Post, Comment, Like, Hashtag, Upload
+from social_network.pagination import (
+    PostCursorPagination,
+    CommentCursorPagination,
+    LikeCursorPagination,
+    ProfileCursorPagination,
+    HashtagCursorPagination,
+)
 from social_network.permissions import IsOwnerOrIfAuthenticatedReadOnly
+from social_network.reactions import set_reactions
+from social_network.search import (
+    autocomplete_profiles,
+    filter_posts,
+    filter_profiles,
+)
 from social_network.serializers import (
+    SparseFieldsMixin,
     ProfileSerializer,
     CommentSerializer,
     PostSerializer,
@@ -19,58 +43,172 @@ from social_network.serializers import (
     CommentCreateSerializer,
     LikeSerializer,
     LikeCreateSerializer,
+    LikeBulkItemSerializer,
+    LikeBulkResultSerializer,
     PostRetrieveSerializer,
+    HashtagSerializer,
+    TrendingHashtagSerializer,
+    UploadSerializer,
 )
+from social_network.trending import trending_hashtags
+from social_network.timeline import feed_posts
+from social_network.uploads import append_chunk, finalize_upload, UploadOffsetMismatch
+
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description="Comma separated fields to return (ex. ?fields=id,title)",
+        required=False,
+    ),
+    OpenApiParameter(
+        "expand",
+        type=OpenApiTypes.STR,
+        description="Comma separated optional fields to include "
+        "(ex. ?expand=comments)",
+        required=False,
+    ),
+]
+
+
+class SparseQuerysetMixin:
+    """Join and prefetch only the relations used by the requested fields."""
+
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
+
+    def prune_queryset(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, SparseFieldsMixin):
+            names = serializer_class.sparse_fields(self.request)
+        else:
+            names = set(self.sparse_select_related) | set(self.sparse_prefetch_related)
+
+        select_related = [
+            lookup
+            for name in names
+            for lookup in self.sparse_select_related.get(name, ())
+        ]
+        prefetch_related = [
+            lookup
+            for name in names
+            for lookup in self.sparse_prefetch_related.get(name, ())
+        ]
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Profile.objects.all()
-        .select_related("user")
-        .prefetch_related("followers", "following")
-    )
+class ValuesListMixin:
+    """Render list actions from `.values()` rows, skipping model instances
+    and serializer field lookups, when the serializer supports it."""
+
+    def get_values_renderer(self):
+        if not settings.FAST_LIST_RENDERING:
+            return None
+        return ValuesRenderer.for_serializer(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        renderer = self.get_values_renderer()
+        if renderer is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        columns = list(renderer.columns)
+        get_ordering = getattr(self.paginator, "get_ordering", None)
+        if get_ordering is not None:
+            for field in get_ordering(request, queryset, self):
+                if field.lstrip("-") not in columns:
+                    columns.append(field.lstrip("-"))
+
+        rows = self.paginate_queryset(queryset.values(*columns))
+        if rows is None:
+            return Response(renderer.render(queryset.values(*columns)))
+        return self.get_paginated_response(renderer.render(rows))
+
+
+class ConditionalRetrieveMixin:
+    """Answer `If-None-Match` on retrieve before the detail queryset runs."""
+
+    etag_func = None
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            etag = self.etag_func(kwargs[self.lookup_field])
+        except (ValueError, TypeError):
+            etag = None
+
+        response = None
+        if etag is not None:
+            etag = vary_etag(
+                etag,
+                request.query_params.get("fields"),
+                request.query_params.get("expand"),
+            )
+            response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        if etag is not None:
+            response["ETag"] = etag
+        return response
+
+
+class ProfileViewSet(
+    ValuesListMixin,
+    SparseQuerysetMixin,
+    ConditionalRetrieveMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
     permission_classes = (IsAuthenticated, IsOwnerOrIfAuthenticatedReadOnly)
+    pagination_class = ProfileCursorPagination
+    etag_func = staticmethod(profile_etag)
+    sparse_select_related = {"user": ("user",), "full_name": ("user",)}
+    autocomplete_limit = 10
+    autocomplete_max_limit = 50
 
     def get_queryset(self):
-        first_name = self.request.query_params.get("first_name")
-        last_name = self.request.query_params.get("last_name")
-        birth_date = self.request.query_params.get("birth_date")
-        queryset = self.queryset
-
-        if first_name:
-            queryset = queryset.filter(user__first_name__icontains=first_name)
-        if last_name:
-            queryset = queryset.filter(user__last_name__icontains=last_name)
-        if birth_date:
-            queryset = queryset.filter(birth_date=birth_date)
+        queryset = filter_profiles(self.queryset, self.request.query_params)
 
         if self.action == "followers":
             profile = self.request.user.profile
-            queryset = (
-                profile.followers.all()
-                .select_related("user")
-                .prefetch_related("followers", "following")
-            )
+            queryset = profile.followers.all()
 
         if self.action == "following":
             profile = self.request.user.profile
-            queryset = (
-                profile.following.all()
-                .select_related("user")
-                .prefetch_related("followers", "following")
+            queryset = profile.following.all()
+
+        if self.action == "follow_or_unfollow":
+            return Profile.objects.select_related("user")
+
+        if self.action == "profile_followers":
+            profile = get_object_or_404(
+                Profile.objects.only("id"), pk=self.kwargs["pk"]
             )
+            queryset = profile.followers.all()
 
-        if self.action == "retrieve":
-            queryset = queryset.prefetch_related(
-                "followers__user",
-                "following__user",
+        if self.action == "profile_following":
+            profile = get_object_or_404(
+                Profile.objects.only("id"), pk=self.kwargs["pk"]
             )
+            queryset = profile.following.all()
 
-        return queryset.distinct()
+        return self.prune_queryset(queryset).distinct()
 
     def get_serializer_class(self):
-        if self.action in ("list", "followers", "following"):
+        if self.action in (
+            "list",
+            "followers",
+            "following",
+            "profile_followers",
+            "profile_following",
+            "autocomplete",
+            "suggestions",
+        ):
             return ProfileListSerializer
         if self.action == "upload_image":
             return ProfileImageSerializer
@@ -96,29 +234,42 @@ class ProfileViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-    @action(methods=["GET"], detail=True)
+    @action(
+        methods=["GET", "POST", "DELETE"],
+        detail=True,
+        permission_classes=[IsAuthenticated],
+    )
     def follow_or_unfollow(self, request, pk=None):
+        """POST follows, DELETE unfollows and GET toggles the follow state."""
         profile = self.get_object()
+        own_profile = self.request.user.profile
 
-        if self.request.user.profile == profile:
+        if own_profile == profile:
             return Response(
                 {"detail": "You cannot follow/unfollow yourself."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if profile in self.request.user.profile.following.all():
-            self.request.user.profile.following.remove(profile)
+        if request.method == "POST":
+            follow(own_profile, profile)
+            following = True
+        elif request.method == "DELETE":
+            unfollow(own_profile, profile)
+            following = False
+        else:
+            following = toggle_follow(own_profile, profile)
+
+        if following:
             return Response(
-                {"detail": f"Now you are unfollowing user {profile}."},
+                {"detail": f"Now you are following user {profile}."},
                 status=status.HTTP_200_OK,
             )
-
-        self.request.user.profile.following.add(profile)
         return Response(
-            {"detail": f"Now you are following user {profile}."},
+            {"detail": f"Now you are unfollowing user {profile}."},
             status=status.HTTP_200_OK,
         )
 
+    @extend_schema(operation_id="social_network_profiles_followers_list")
     @action(
         methods=["GET"],
         detail=False,
@@ -127,6 +278,7 @@ class ProfileViewSet(viewsets.ModelViewSet):
     def followers(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    @extend_schema(operation_id="social_network_profiles_following_list")
     @action(
         methods=["GET"],
         detail=False,
@@ -135,6 +287,66 @@ class ProfileViewSet(viewsets.ModelViewSet):
     def following(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                description="Name prefix, every word must match (ex. ?q=jo sm)",
+                required=True,
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Number of profiles to return (ex. ?limit=10)",
+                required=False,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="autocomplete")
+    def autocomplete(self, request):
+        try:
+            limit = int(request.query_params.get("limit", self.autocomplete_limit))
+        except ValueError:
+            limit = self.autocomplete_limit
+        limit = min(max(limit, 1), self.autocomplete_max_limit)
+
+        profiles = autocomplete_profiles(
+            self.prune_queryset(Profile.objects.all()),
+            request.query_params.get("q", ""),
+            limit,
+        )
+        serializer = self.get_serializer(profiles, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(methods=["GET"], detail=False, url_path="suggestions")
+    def suggestions(self, request):
+        profiles = self.prune_queryset(
+            Profile.objects.filter(suggested_to__profile__user=request.user)
+        ).order_by("-suggested_to__score", "id")
+        serializer = self.get_serializer(profiles, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(operation_id="social_network_profiles_detail_followers_list")
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="followers",
+        url_name="detail-followers",
+    )
+    def profile_followers(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+    @extend_schema(operation_id="social_network_profiles_detail_following_list")
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="following",
+        url_name="detail-following",
+    )
+    def profile_following(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -155,59 +367,56 @@ class ProfileViewSet(viewsets.ModelViewSet):
                 description="Filter by birth_date " "(ex. ?birth_date=2014-08-21)",
                 required=False,
             ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Post.objects.all()
-        .select_related("user")
-        .prefetch_related(
-            "likes",
-            "comments__user",
-        )
-        .annotate(
-            likes_count=Count("likes", filter=Q(likes__action="like")),
-            dislikes_count=Count("likes", filter=Q(likes__action="dislike")),
-        )
-    ).order_by("-created")
+class PostViewSet(
+    ValuesListMixin,
+    SparseQuerysetMixin,
+    ConditionalRetrieveMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Post.objects.all().order_by("-created")
     serializer_class = PostSerializer
     permission_classes = (IsAuthenticated, IsOwnerOrIfAuthenticatedReadOnly)
+    pagination_class = PostCursorPagination
+    etag_func = staticmethod(post_etag)
+    sparse_select_related = {"user": ("user",)}
+    sparse_prefetch_related = {"comments": ("comments__user",)}
+    bulk_reactions_max_items = 100
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.prune_queryset(self.queryset)
 
         if self.action in ("list", "my_posts_list", "liked_posts_list"):
 
             if self.action == "list":
-                queryset = self.queryset.filter(
-                    Q(user__profile__followers=self.request.user.profile)
-                    | Q(user__profile=self.request.user.profile)
-                )
+                queryset = feed_posts(self.request.user.pk, queryset)
 
             if self.action == "my_posts_list":
-                queryset = self.queryset.filter(user__profile=self.request.user.profile)
+                queryset = queryset.filter(user__profile=self.request.user.profile)
 
             if self.action == "liked_posts_list":
-                queryset = self.queryset.filter(
+                queryset = queryset.filter(
                     likes__user=self.request.user, likes__action="like"
                 )
 
-            text = self.request.query_params.get("text")
-            hashtags = self.request.query_params.get("hashtags")
+            queryset = filter_posts(queryset, self.request.query_params)
 
-            if text:
-                queryset = queryset.filter(
-                    Q(title__icontains=text) | Q(text__icontains=text)
-                )
-            if hashtags:
-                queryset = queryset.filter(hashtags__icontains=hashtags)
+            if self.action == "list":
+                return queryset
 
         return queryset.distinct()
 
+    def get_throttles(self):
+        if self.action == "add_comment":
+            self.throttle_scope = "comment"
+        return super().get_throttles()
+
     def get_serializer_class(self):
         if self.action in ("list", "my_posts_list", "liked_posts_list"):
             return PostListSerializer
@@ -239,7 +448,9 @@ class PostViewSet(viewsets.ModelViewSet):
         post = self.get_object()
         serializer = CommentCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(user=request.user, post=post)
+        with transaction.atomic():
+            serializer.save(user=request.user, post=post)
+            increment_comments(post.pk)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(
@@ -257,6 +468,35 @@ class PostViewSet(viewsets.ModelViewSet):
         serializer.save(user=request.user, post=post)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @extend_schema(
+        request=LikeBulkItemSerializer(many=True),
+        responses={200: LikeBulkResultSerializer(many=True)},
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="bulk_add_like_dislike",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_add_like_dislike(self, request):
+        serializer = LikeBulkItemSerializer(
+            data=request.data, many=True, max_length=self.bulk_reactions_max_items
+        )
+        serializer.is_valid(raise_exception=True)
+        items = [
+            (item["post_id"], item["action"]) for item in serializer.validated_data
+        ]
+
+        statuses = set_reactions(request.user.pk, items)
+        results = [
+            {"post_id": post_id, "action": action, "status": item_status}
+            for (post_id, action), item_status in zip(items, statuses)
+        ]
+        return Response(
+            LikeBulkResultSerializer(results, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
     @action(
         methods=["GET"],
         detail=False,
@@ -278,28 +518,165 @@ class PostViewSet(viewsets.ModelViewSet):
             OpenApiParameter(
                 "text",
                 type=OpenApiTypes.STR,
-                description="Filter by post title and text (ex. ?text=a)",
+                description="Full-text search by post title and text, "
+                "results are ranked by relevance (ex. ?text=a)",
                 required=False,
             ),
             OpenApiParameter(
-                "hashtag",
+                "hashtags",
                 type=OpenApiTypes.STR,
-                description="Filter by hashtag (ex. ?hashtag=a)",
+                description="Filter by exact hashtags, comma separated "
+                "(ex. ?hashtags=art,music)",
                 required=False,
             ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
-class CommentViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Comment.objects.all().select_related("user", "post")
+class CommentViewSet(SparseQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticated, IsOwnerOrIfAuthenticatedReadOnly)
+    pagination_class = CommentCursorPagination
+    sparse_select_related = {"user": ("user",), "post": ("post",)}
+
+    def get_queryset(self):
+        return self.prune_queryset(self.queryset)
 
 
 class LikeViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Like.objects.all().select_related("user", "post")
     serializer_class = LikeSerializer
     permission_classes = (IsAuthenticated, IsOwnerOrIfAuthenticatedReadOnly)
+    pagination_class = LikeCursorPagination
+
+
+class HashtagViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Hashtag.objects.all()
+    serializer_class = HashtagSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = HashtagCursorPagination
+
+    trending_windows = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+    trending_default_limit = 10
+    trending_max_limit = 100
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Number of hashtags per window (ex. ?limit=10)",
+                required=False,
+            ),
+        ],
+        responses={200: TrendingHashtagSerializer(many=True)},
+    )
+    @action(methods=["GET"], detail=False, url_path="trending")
+    def trending(self, request):
+        try:
+            limit = int(request.query_params.get("limit", self.trending_default_limit))
+        except ValueError:
+            limit = self.trending_default_limit
+        limit = min(max(limit, 1), self.trending_max_limit)
+
+        return Response(
+            {
+                name: TrendingHashtagSerializer(
+                    trending_hashtags(window, limit), many=True
+                ).data
+                for name, window in self.trending_windows.items()
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class UploadViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Resumable image uploads: create, PUT chunks at an offset, finalize.
+
+    Pass the finalized upload id as `upload` to profile upload-image or
+    post creation instead of a multipart image.
+    """
+
+    queryset = Upload.objects.all()
+    serializer_class = UploadSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(
+            user=self.request.user, status=Upload.StatusChoices.PENDING
+        )
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @extend_schema(
+        request={"application/offset+octet-stream": bytes},
+        parameters=[
+            OpenApiParameter(
+                "Upload-Offset",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.HEADER,
+                description="Byte offset of the chunk, must match the upload offset",
+                required=True,
+            ),
+        ],
+    )
+    @action(methods=["PUT"], detail=True, url_path="chunk")
+    def chunk(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers.get("Content-Length") or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "Upload-Offset and Content-Length headers are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if length > settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+            return Response(
+                {"detail": "Chunk is too large."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        if offset + length > upload.size:
+            return Response(
+                {"detail": "Chunk exceeds the declared upload size."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            append_chunk(upload, offset, request.stream, length)
+        except UploadOffsetMismatch as error:
+            return Response(
+                {"detail": str(error), "offset": error.offset},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(self.get_serializer(upload).data, status=status.HTTP_200_OK)
+
+    @action(methods=["POST"], detail=True, url_path="finalize")
+    def finalize(self, request, pk=None):
+        upload = self.get_object()
+        if upload.offset != upload.size:
+            return Response(
+                {"detail": "Upload is incomplete.", "offset": upload.offset},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            finalize_upload(upload)
+        except (OSError, Image.DecompressionBombError):
+            return Response(
+                {"detail": "Upload a valid image."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(self.get_serializer(upload).data, status=status.HTTP_200_OK)
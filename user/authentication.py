@@ -0,0 +1,163 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def _row(instance) -> tuple:
+    return tuple(
+        getattr(instance, field.attname) for field in instance._meta.concrete_fields
+    )
+
+
+class TokenCache:
+    """Bounded LRU of token key -> token and user field values.
+
+    Entries hold plain values and every hit builds new instances, so nothing
+    a request does to its user or token is seen by another request. Each
+    entry remembers the revocation marker of its key as it was before the
+    token was loaded; see `revoke_token`.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return (token with its user, marker) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            token_row, user_row, marker, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+        token = Token.from_db(DEFAULT_DB_ALIAS, None, token_row)
+        token.user = get_user_model().from_db(DEFAULT_DB_ALIAS, None, user_row)
+        return token, marker
+
+    def set(self, token: Token, marker, ttl: float) -> None:
+        entry = (_row(token), _row(token.user), marker, time.monotonic() + ttl)
+        with self._lock:
+            self._entries[token.key] = entry
+            self._entries.move_to_end(token.key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+
+def _revocations():
+    return caches[getattr(settings, "TOKEN_REVOCATION_CACHE", "default")]
+
+
+def _marker_key(key: str) -> str:
+    return f"token-revoked:{key}"
+
+
+def revoke_token(key: str) -> None:
+    """Make every process drop its cached copy of the token.
+
+    The marker changes for longer than any entry lives, and a cached entry
+    is only used while the marker still matches the one read before the
+    token was loaded. `TOKEN_REVOCATION_CACHE` must be shared by all worker
+    processes for this to reach them.
+    """
+    _revocations().set(_marker_key(key), uuid.uuid4().hex, settings.TOKEN_CACHE_TTL)
+    token_cache.invalidate(key)
+
+
+def token_expires(token: Token):
+    if settings.TOKEN_LIFETIME is None:
+        return None
+    return token.created + timedelta(seconds=settings.TOKEN_LIFETIME)
+
+
+def check_token(token: Token, marker) -> None:
+    """Reject tokens of inactive users and expired tokens, cache the rest."""
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed("User inactive or deleted.")
+
+    ttl = settings.TOKEN_CACHE_TTL
+    expires = token_expires(token)
+    if expires is not None:
+        remaining = (expires - timezone.now()).total_seconds()
+        if remaining <= 0:
+            raise exceptions.AuthenticationFailed("Token has expired.")
+        ttl = min(ttl, remaining)
+    token_cache.set(token, marker, ttl)
+
+
+def authenticate_token(key: str) -> Token:
+    cached = token_cache.get(key)
+    marker = _revocations().get(_marker_key(key))
+    if cached is not None and cached[1] == marker:
+        return cached[0]
+
+    try:
+        token = Token.objects.select_related("user").get(key=key)
+    except Token.DoesNotExist:
+        raise exceptions.AuthenticationFailed("Invalid token.")
+    check_token(token, marker)
+    return token
+
+
+async def aauthenticate_token(key: str) -> Token:
+    cached = token_cache.get(key)
+    marker = await _revocations().aget(_marker_key(key))
+    if cached is not None and cached[1] == marker:
+        return cached[0]
+
+    try:
+        token = await Token.objects.select_related("user").aget(key=key)
+    except Token.DoesNotExist:
+        raise exceptions.AuthenticationFailed("Invalid token.")
+    check_token(token, marker)
+    return token
+
+
+def rotate_token(user) -> Token:
+    """Replace the user's token with a new one."""
+    with transaction.atomic():
+        Token.objects.filter(user=user).delete()
+        return Token.objects.create(user=user)
+
+
+def get_valid_token(user) -> Token:
+    token, created = Token.objects.get_or_create(user=user)
+    expires = token_expires(token)
+    if not created and expires is not None and expires <= timezone.now():
+        token = rotate_token(user)
+    return token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication with expiry that serves repeat lookups from
+    `token_cache` without database queries."""
+
+    def authenticate_credentials(self, key):
+        token = authenticate_token(key)
+        return token.user, token
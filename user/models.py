@@ -42,6 +42,7 @@ class User(AbstractUser):
 
     username = None
     email = models.EmailField(_("email address"), unique=True)
+    updated = models.DateTimeField(auto_now=True)
 
     @property
     def full_name(self) -> str:
@@ -1,3 +1,114 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from social_network.throttling import get_backend
+from user.authentication import authenticate_token, token_cache
+
+LOGIN_URL = reverse("user:login")
+LOGOUT_URL = reverse("user:logout")
+ROTATE_URL = reverse("user:token-rotate")
+ME_URL = reverse("user:manage")
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        get_backend().clear()
+        self.addCleanup(get_backend().clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+        )
+
+    def login(self) -> str:
+        res = self.client.post(
+            LOGIN_URL, {"email": "user@test.com", "password": "password"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["token"]
+
+    def get_me(self, key):
+        return self.client.get(ME_URL, HTTP_AUTHORIZATION=f"Token {key}")
+
+    def test_repeated_requests_authenticate_from_cache(self):
+        key = self.login()
+        self.assertEqual(self.get_me(key).status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            res = self.get_me(key)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], "user@test.com")
+
+    def test_revocation_marker_reaches_other_processes(self):
+        key = self.login()
+        self.assertEqual(self.get_me(key).status_code, status.HTTP_200_OK)
+
+        # What revoke_token leaves behind for workers it cannot reach directly.
+        cache.set(f"token-revoked:{key}", "revoked")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_me(key).status_code, status.HTTP_200_OK)
+
+    def test_cache_hits_return_new_instances(self):
+        key = self.login()
+        authenticate_token(key).user.email = "changed@test.com"
+
+        first, second = authenticate_token(key), authenticate_token(key)
+        self.assertIsNot(first.user, second.user)
+        self.assertEqual(second.user.email, "user@test.com")
+
+    def test_logout_invalidates_cached_token(self):
+        key = self.login()
+        self.assertEqual(self.get_me(key).status_code, status.HTTP_200_OK)
+
+        res = self.client.get(LOGOUT_URL, HTTP_AUTHORIZATION=f"Token {key}")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_me(key).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_not_served_from_cache(self):
+        key = self.login()
+        self.assertEqual(self.get_me(key).status_code, status.HTTP_200_OK)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_me(key).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_LIFETIME=3600)
+    def test_expired_token_is_rejected_and_replaced_on_login(self):
+        key = self.login()
+        Token.objects.filter(key=key).update(
+            created=timezone.now() - timedelta(hours=2)
+        )
+
+        res = self.get_me(key)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.data["detail"], "Token has expired.")
+
+        new_key = self.login()
+        self.assertNotEqual(new_key, key)
+        self.assertEqual(self.get_me(new_key).status_code, status.HTTP_200_OK)
+
+    def test_rotate_replaces_token(self):
+        key = self.login()
+        self.assertEqual(self.get_me(key).status_code, status.HTTP_200_OK)
+
+        res = self.client.post(ROTATE_URL, HTTP_AUTHORIZATION=f"Token {key}")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        new_key = res.data["token"]
+
+        self.assertNotEqual(new_key, key)
+        self.assertEqual(self.get_me(key).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get_me(new_key).status_code, status.HTTP_200_OK)
+
+    def test_rotate_is_documented(self):
+        res = self.client.get(reverse("schema"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(ROTATE_URL, res.content.decode())
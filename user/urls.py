@@ -1,5 +1,11 @@
 from django.urls import path
-from user.views import CreateUserView, CreateTokenView, ManageUserView, LogoutUserView
+from user.views import (
+    CreateUserView,
+    CreateTokenView,
+    ManageUserView,
+    LogoutUserView,
+    RotateTokenView,
+)
 
 app_name = "user"
 
@@ -7,5 +13,6 @@ urlpatterns = [
     path("register/", CreateUserView.as_view(), name="create"),
     path("login/", CreateTokenView.as_view(), name="login"),
     path("logout/", LogoutUserView.as_view(), name="logout"),
+    path("token/rotate/", RotateTokenView.as_view(), name="token-rotate"),
     path("me/", ManageUserView.as_view(), name="manage"),
 ]
@@ -1,5 +1,5 @@
+from drf_spectacular.utils import extend_schema
 from rest_framework import generics, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
@@ -7,6 +7,11 @@ from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
 
+from user.authentication import (
+    CachedTokenAuthentication,
+    get_valid_token,
+    rotate_token,
+)
 from user.serializers import UserSerializer, AuthTokenSerializer
 
 from django.contrib.auth import logout
@@ -19,12 +24,30 @@ class CreateUserView(generics.CreateAPIView):
 
 class CreateTokenView(ObtainAuthToken):
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
     serializer_class = AuthTokenSerializer
+    throttle_scope = "login"
+    throttle_data_field = "email"
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = get_valid_token(serializer.validated_data["user"])
+        return Response({"token": token.key})
+
+
+class RotateTokenView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(request=None, responses=AuthTokenSerializer)
+    def post(self, request):
+        token = rotate_token(request.user)
+        return Response({"token": token.key}, status=status.HTTP_200_OK)
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):